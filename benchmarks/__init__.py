@@ -0,0 +1 @@
+"""Offline benchmarks and golden checks for the scraper and cleaner"""
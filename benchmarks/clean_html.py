@@ -0,0 +1,107 @@
+#!/usr/bin/env python3
+"""
+Golden check and micro-benchmark for DataCleaner.clean_html_text
+Compares the single-pass tokenizer with the original regex-per-pattern loop
+
+Run from the repository root: python -m benchmarks.clean_html
+"""
+
+import argparse
+import json
+import logging
+import re
+import sys
+import time
+from typing import Any, List
+
+from clean_data import DataCleaner
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def reference_clean_html_text(cleaner: DataCleaner, text: str) -> str:
+    """clean_html_text as it was before the single-pass tokenizer"""
+    if not isinstance(text, str):
+        return text
+
+    for pattern in cleaner.html_patterns:
+        text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+
+    text = re.sub(r'\s+', ' ', text)
+    text = text.strip()
+
+    text = re.sub(r'\s*;\s*', '\n• ', text)
+    text = re.sub(r'^\s*•\s*', '• ', text, flags=re.MULTILINE)
+
+    return text
+
+def collect_strings(value: Any, out: List[str]) -> List[str]:
+    """Every string value in a nested JSON structure"""
+    if isinstance(value, dict):
+        for item in value.values():
+            collect_strings(item, out)
+    elif isinstance(value, list):
+        for item in value:
+            collect_strings(item, out)
+    elif isinstance(value, str):
+        out.append(value)
+    return out
+
+def time_it(func, strings: List[str], repeat: int) -> float:
+    """Best wall time over repeat passes across all strings"""
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for text in strings:
+            func(text)
+        best = min(best, time.perf_counter() - start)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--input', default='startup_details.json', help='Raw scraper output')
+    parser.add_argument('--golden', default='startup_details_clean.json', help='Expected clean_data.py output')
+    parser.add_argument('--repeat', type=int, default=5)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        raw_data = json.load(f)
+
+    cleaner = DataCleaner()
+    strings = collect_strings(raw_data, [])
+    logger.info(f"Loaded {len(raw_data)} startups with {len(strings)} string values")
+
+    # Golden check 1: every string cleans exactly as before
+    mismatches = [text for text in strings if cleaner.clean_html_text(text) != reference_clean_html_text(cleaner, text)]
+    fallbacks = sum(1 for text in strings if cleaner.html_leftovers.search(cleaner.html_tokenizer.sub('', text)))
+
+    # Golden check 2: the full cleaning run reproduces the committed clean file
+    golden_ok = None
+    if args.golden:
+        with open(args.golden, 'r', encoding='utf-8') as f:
+            golden = json.load(f)
+        golden_ok = cleaner.clean_all_startups(raw_data) == golden
+
+    reference_time = time_it(lambda text: reference_clean_html_text(cleaner, text), strings, args.repeat)
+    tokenizer_time = time_it(cleaner.clean_html_text_uncached, strings, args.repeat)
+    cached_time = time_it(cleaner.clean_html_text, strings, args.repeat)
+
+    logger.info("=" * 50)
+    logger.info("CLEAN_HTML_TEXT BENCHMARK")
+    logger.info("=" * 50)
+    logger.info(f"Per-pattern loop:     {reference_time * 1000:8.1f} ms")
+    logger.info(f"Single-pass scan:     {tokenizer_time * 1000:8.1f} ms")
+    logger.info(f"Speedup:              {reference_time / tokenizer_time:8.2f}x")
+    logger.info(f"Memoized (warm):      {cached_time * 1000:8.1f} ms")
+    logger.info(f"Sequential fallbacks: {fallbacks}/{len(strings)}")
+    logger.info(f"String mismatches:    {len(mismatches)}")
+    if golden_ok is not None:
+        logger.info(f"Golden output match:  {golden_ok}")
+
+    if mismatches or golden_ok is False:
+        for text in mismatches[:5]:
+            logger.error(f"Mismatch on: {text[:200]!r}")
+        sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+clean_data.py wall time and peak memory at several input sizes
+Inputs are synthesized by repeating startup_details.json with fresh ids
+
+Run from the repository root: python -m benchmarks.clean_scaling --sizes 1000,10000,50000
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+import tempfile
+
+from benchmarks.scrape import int_list, run_measured
+from jsonl_store import JsonArrayWriter
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+MODES = {
+    'default': [],
+    'stream': ['--stream'],
+    'workers': ['--workers', '0'],
+}
+
+def synthesize(templates: list, size: int, path: str) -> None:
+    with JsonArrayWriter(path) as writer:
+        for i in range(size):
+            writer.write({**templates[i % len(templates)], 'id': i + 1})
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default='startup_details.json', help='Raw startups used as templates')
+    parser.add_argument('--sizes', type=int_list, default=[1000, 10000, 50000], help='Record counts to time')
+    parser.add_argument('--modes', default=','.join(MODES), help=f"Comma-separated subset of {', '.join(MODES)}")
+    parser.add_argument('--text-cache-size', type=int, default=0,
+                        help='Passed to clean_data.py; 0 by default since repeated templates would all hit the cache')
+    parser.add_argument('--output', default=None, help='Also write the results as JSON')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+
+    results = []
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            input_file = os.path.join(tmp, f"raw_{size}.json")
+            synthesize(templates, size, input_file)
+            logger.info(f"Synthesized {size} startups ({os.path.getsize(input_file) / 1024 / 1024:.1f} MB)")
+
+            for mode in args.modes.split(','):
+                cmd = [sys.executable, 'clean_data.py', '--input', input_file,
+                       '--output', os.path.join(tmp, 'clean.json'), '--summary', os.path.join(tmp, 'summary.json'),
+                       '--text-cache-size', str(args.text_cache_size), *MODES[mode]]
+                returncode, _, stderr, elapsed, peak_rss = run_measured(cmd)
+                if returncode != 0:
+                    logger.error(f"clean_data.py failed for {size} records ({mode}):\n{stderr[-2000:]}")
+                    continue
+                results.append({'size': size, 'mode': mode, 'elapsed': elapsed,
+                                'records_per_sec': size / elapsed, 'peak_rss_mb': peak_rss})
+
+    logger.info("=" * 60)
+    logger.info("CLEAN_DATA SCALING")
+    logger.info("=" * 60)
+    logger.info(f"{'records':>8} {'mode':>8} {'seconds':>8} {'rec/s':>9} {'RSS MB':>8}")
+    for r in results:
+        logger.info(f"{r['size']:>8} {r['mode']:>8} {r['elapsed']:>8.2f} {r['records_per_sec']:>9.0f} "
+                    f"{r['peak_rss_mb']:>8.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
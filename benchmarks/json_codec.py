@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+JSON backend speed and record memory on large dumps
+Times decoding and pretty-printing cleaned startups with each available
+codec, and compares the memory held by plain dicts and typed Startup records
+
+Run from the repository root: python -m benchmarks.json_codec --records 100000
+"""
+
+import argparse
+import gc
+import json
+import logging
+import time
+import tracemalloc
+
+from json_codec import get_codec, orjson
+from models import iter_startups
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def timed(func, *args):
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+def held_memory(build) -> float:
+    """Bytes still allocated by build() once it has returned (its result is kept alive)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default='startup_details_clean.json', help='Cleaned startups used as templates')
+    parser.add_argument('--records', type=int, default=50000, help='Records in the synthesized dump')
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+    records = [{**templates[i % len(templates)], 'id': i + 1} for i in range(args.records)]
+    reference = json.dumps(records, indent=2, ensure_ascii=False).encode('utf-8')
+    logger.info(f"Synthesized {len(records)} startups ({len(reference) / 1024 / 1024:.1f} MB pretty-printed)")
+
+    backends = ['stdlib'] + (['orjson'] if orjson is not None else [])
+    for backend in backends:
+        codec = get_codec(backend)
+        decoded, decode_time = timed(codec.loads, reference)
+        encoded, encode_time = timed(codec.dumps_pretty, decoded)
+        identical = encoded.encode('utf-8') == reference
+        logger.info(f"{backend:>7}: decode {decode_time:.2f}s, pretty encode {encode_time:.2f}s, "
+                    f"output {'byte-identical' if identical else 'DIFFERS'}")
+
+    # Parse the dump afresh each time so no strings are shared with the records built above
+    codec = get_codec()
+    dict_bytes = held_memory(lambda: codec.loads(reference))
+    typed_bytes = held_memory(lambda: list(iter_startups(codec.loads(reference))))
+    logger.info(f"Memory per record: dicts {dict_bytes / len(records):.0f} B, "
+                f"Startup {typed_bytes / len(records):.0f} B ({typed_bytes / dict_bytes:.0%})")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the knowledge-share.eu pages API
+Serves listing and detail endpoints synthesized from startup_details.json,
+with optional latency, 429 and 5xx injection
+
+Run from the repository root: python -m benchmarks.mock_api --records 100000
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import random
+from collections import Counter
+from typing import Any, Dict, List
+
+from aiohttp import web
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# Parts of a real detail response that the scraper strips again
+IMAGE_STUB = {'id': 1, 'title': 'cover', 'url': '/media/cover.jpg', 'alt': '',
+              'renditions': {'small': '/media/cover.small.jpg', 'large': '/media/cover.large.jpg'}}
+
+class MockKnowledgeShareAPI:
+    """Synthetic startups built on demand from a small set of templates
+
+    Record n (1-based) is template n % len(templates) with id n, so any
+    number of records can be served without holding them in memory. Ids are
+    listed newest (highest) first, like order=-first_published_at.
+    """
+
+    def __init__(self, templates: List[Dict[str, Any]], records: int, latency_ms: float = 0.0,
+                 jitter: float = 0.5, error_429: float = 0.0, error_5xx: float = 0.0,
+                 retry_after: int = 1, seed: int = 0):
+        self.templates = templates
+        self.records = records
+        self.latency_ms = latency_ms
+        self.jitter = jitter
+        self.error_429 = error_429
+        self.error_5xx = error_5xx
+        self.retry_after = retry_after
+        self.random = random.Random(seed)
+        self.base_url = ''
+        self.reset()
+
+    def reset(self) -> None:
+        self.requests = Counter()
+        self.statuses = Counter()
+        self.served_ids = set()
+
+    def make_record(self, startup_id: int) -> Dict[str, Any]:
+        template = self.templates[startup_id % len(self.templates)]
+        return {**template, 'id': startup_id, 'title': f"{template.get('title', 'Startup')} #{startup_id}"}
+
+    def listing_item(self, startup_id: int) -> Dict[str, Any]:
+        record = self.make_record(startup_id)
+        return {
+            'id': startup_id,
+            'meta': {
+                'type': 'startups.StartUpPage',
+                'detailUrl': f"{self.base_url}/api/pages/{startup_id}/",
+                'firstPublishedAt': f"2024-01-01T00:00:00.{startup_id:06d}Z",
+            },
+            'title': record['title'],
+            'abstract': record.get('abstract'),
+            'categories': record.get('categories'),
+            'fundingStage': record.get('fundingStage'),
+            'lookingFor': record.get('lookingFor'),
+            'trl': record.get('trl'),
+            'previewImage': IMAGE_STUB,
+        }
+
+    async def inject_faults(self, request: web.Request) -> None:
+        if self.latency_ms:
+            spread = self.latency_ms * self.jitter
+            await asyncio.sleep(max(0.0, self.random.uniform(self.latency_ms - spread, self.latency_ms + spread)) / 1000)
+        roll = self.random.random()
+        if roll < self.error_429:
+            # Delta-seconds must be a whole number (RFC 9110), or clients ignore the header
+            raise web.HTTPTooManyRequests(headers={'Retry-After': str(int(math.ceil(self.retry_after)))})
+        if roll < self.error_429 + self.error_5xx:
+            raise web.HTTPServiceUnavailable()
+
+    @web.middleware
+    async def middleware(self, request: web.Request, handler) -> web.StreamResponse:
+        self.requests['listing' if request.path == '/api/pages/' else 'detail'
+                      if request.path.startswith('/api/pages/') else 'other'] += 1
+        try:
+            if request.path.startswith('/api/'):
+                await self.inject_faults(request)
+            response = await handler(request)
+        except web.HTTPException as e:
+            self.statuses[e.status] += 1
+            raise
+        self.statuses[response.status] += 1
+        return response
+
+    async def listing(self, request: web.Request) -> web.Response:
+        limit = int(request.query.get('limit', 20))
+        offset = int(request.query.get('offset', 0))
+        first = self.records - offset
+        ids = range(first, max(first - limit, 0), -1)
+        return web.json_response({
+            'meta': {'totalCount': self.records},
+            'items': [self.listing_item(startup_id) for startup_id in ids],
+        })
+
+    async def detail(self, request: web.Request) -> web.Response:
+        startup_id = int(request.match_info['startup_id'])
+        if not 1 <= startup_id <= self.records:
+            raise web.HTTPNotFound()
+        self.served_ids.add(startup_id)
+        record = self.make_record(startup_id)
+        return web.json_response({
+            **record,
+            'meta': {'type': 'startups.StartUpPage', 'slug': f"startup-{startup_id}"},
+            'coverImage': IMAGE_STUB,
+            'logo': IMAGE_STUB,
+        })
+
+    async def stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            'requests': dict(self.requests),
+            'statuses': {str(status): count for status, count in self.statuses.items()},
+            'distinct_details': len(self.served_ids),
+        })
+
+    async def reset_stats(self, request: web.Request) -> web.Response:
+        self.reset()
+        return web.json_response({'ok': True})
+
+    def make_app(self) -> web.Application:
+        app = web.Application(middlewares=[self.middleware])
+        app.router.add_get('/api/pages/', self.listing)
+        app.router.add_get('/api/pages/{startup_id:\\d+}/', self.detail)
+        app.router.add_get('/__stats', self.stats)
+        app.router.add_post('/__reset', self.reset_stats)
+        return app
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default='startup_details.json', help='Startups used as record templates')
+    parser.add_argument('--records', type=int, default=None, help='Number of startups to serve (default: as many as the input)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0.0, help='Mean added latency per API request')
+    parser.add_argument('--jitter', type=float, default=0.5, help='Latency spread as a fraction of the mean')
+    parser.add_argument('--error-429', type=float, default=0.0, help='Fraction of API requests answered 429')
+    parser.add_argument('--error-5xx', type=float, default=0.0, help='Fraction of API requests answered 503')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    with open(args.input, 'r', encoding='utf-8') as f:
+        templates = json.load(f)
+
+    api = MockKnowledgeShareAPI(templates, args.records or len(templates), latency_ms=args.latency_ms,
+                                jitter=args.jitter, error_429=args.error_429, error_5xx=args.error_5xx,
+                                retry_after=args.retry_after, seed=args.seed)
+    api.base_url = f"http://{args.host}:{args.port}"
+    logger.info(f"Serving {api.records} synthetic startups on {api.base_url}/api/pages/")
+    web.run_app(api.make_app(), host=args.host, port=args.port, print=None, access_log=None)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Scraper throughput benchmark against the local mock API
+Runs scraper.py's StartupDetailsScraper over a grid of settings and reports
+records/sec, detail latency quantiles, error responses, retries and peak RSS
+for each
+
+Run from the repository root:
+    python -m benchmarks.scrape --records 5000 --concurrency 10,30,60 --latency-ms 50 --error-429 0.01
+"""
+
+import argparse
+import asyncio
+import itertools
+import json
+import logging
+import math
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import urllib.request
+from typing import Any, Dict, List, Tuple
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def percentile(values: List[float], q: float) -> float:
+    """Nearest-rank percentile of an unsorted list"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[max(0, math.ceil(q * len(ordered)) - 1)]
+
+def run_measured(cmd: List[str]) -> Tuple[int, str, str, float, float]:
+    """Run a command, returning (returncode, stdout, stderr, wall seconds, peak RSS in MB)
+
+    os.wait4 gives the rusage of exactly this child, so peak RSS is not
+    mixed up with earlier runs or with the mock server.
+    """
+    with tempfile.TemporaryFile('w+') as out, tempfile.TemporaryFile('w+') as err:
+        start = time.perf_counter()
+        proc = subprocess.Popen(cmd, stdout=out, stderr=err)
+        _, status, usage = os.wait4(proc.pid, 0)
+        elapsed = time.perf_counter() - start
+        proc.returncode = os.waitstatus_to_exitcode(status)
+        out.seek(0)
+        err.seek(0)
+        # ru_maxrss is in KB on Linux
+        return proc.returncode, out.read(), err.read(), elapsed, usage.ru_maxrss / 1024
+
+def http_json(url: str, method: str = 'GET') -> Dict[str, Any]:
+    request = urllib.request.Request(url, method=method, data=b'' if method == 'POST' else None)
+    with urllib.request.urlopen(request, timeout=5) as response:
+        return json.loads(response.read())
+
+def start_mock_server(args: argparse.Namespace) -> subprocess.Popen:
+    cmd = [sys.executable, '-m', 'benchmarks.mock_api', '--input', args.input, '--records', str(args.records),
+           '--port', str(args.port), '--latency-ms', str(args.latency_ms), '--error-429', str(args.error_429),
+           '--error-5xx', str(args.error_5xx), '--retry-after', str(args.retry_after)]
+    server = subprocess.Popen(cmd, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 30
+    while time.monotonic() < deadline:
+        try:
+            http_json(f"http://127.0.0.1:{args.port}/__stats")
+            return server
+        except OSError:
+            time.sleep(0.1)
+    server.terminate()
+    raise RuntimeError(f"Mock API did not start on port {args.port}")
+
+def run_child(config: Dict[str, Any]) -> None:
+    """Scrape the mock API once in this process and print the measurements as JSON"""
+    from jsonl_store import JsonlCheckpointWriter
+    from metrics import MetricsRegistry
+    from scraper import StartupDetailsScraper
+
+    logging.getLogger().setLevel(logging.WARNING)
+    latencies = []
+    metrics = MetricsRegistry()
+
+    class TimedScraper(StartupDetailsScraper):
+        async def get_startup_details(self, session, startup_info):
+            start = time.perf_counter()
+            try:
+                return await super().get_startup_details(session, startup_info)
+            finally:
+                latencies.append(time.perf_counter() - start)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        scraper = TimedScraper(max_concurrent=config['concurrency'], request_delay=config['request_delay'],
+                               retry_backoff=1.0, dead_letter_file=os.path.join(tmp, 'dead_letters.jsonl'),
+                               metrics=metrics)
+        scraper.LISTINGS_API = f"{config['base_url']}/api/pages/"
+        scraper.PAGE_SIZE = config['page_size']
+        scraper.CONNECTOR_LIMIT = config['connector_limit']
+        scraper.CONNECTOR_LIMIT_PER_HOST = config['limit_per_host']
+
+        # Count throttles whose Retry-After the limiter could actually use
+        retry_after_backoffs = []
+        record_throttle = scraper.rate_limiter.record_throttle
+
+        def counting_record_throttle(retry_after=None):
+            if retry_after:
+                retry_after_backoffs.append(retry_after)
+            record_throttle(retry_after)
+
+        scraper.rate_limiter.record_throttle = counting_record_throttle
+
+        writer = JsonlCheckpointWriter(os.path.join(tmp, 'startup_details.jsonl'))
+        start = time.perf_counter()
+        try:
+            asyncio.run(scraper.scrape_all_details(writer=writer))
+        finally:
+            writer.close()
+        elapsed = time.perf_counter() - start
+
+    print(json.dumps({
+        'records': writer.count,
+        'elapsed': elapsed,
+        'p50_ms': percentile(latencies, 0.50) * 1000,
+        'p95_ms': percentile(latencies, 0.95) * 1000,
+        'p99_ms': percentile(latencies, 0.99) * 1000,
+        # Request retries inside fetch_json plus detail requeues by the worker pool
+        'retries': int(sum(metrics.counters.get('scraper_fetch_retries_total', {}).values())
+                       + sum(metrics.counters.get('scraper_requeues_total', {}).values())),
+        'retry_after_backoffs': len(retry_after_backoffs),
+    }))
+
+def int_list(value: str) -> List[int]:
+    return [int(v) for v in value.split(',')]
+
+def float_list(value: str) -> List[float]:
+    return [float(v) for v in value.split(',')]
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--input', default='startup_details.json', help='Startups used as mock API templates')
+    parser.add_argument('--records', type=int, default=2000, help='Synthetic startups served by the mock API')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=20.0, help='Mean latency added per API request')
+    parser.add_argument('--error-429', type=float, default=0.0, help='Fraction of requests answered 429')
+    parser.add_argument('--error-5xx', type=float, default=0.0, help='Fraction of requests answered 503')
+    parser.add_argument('--retry-after', type=int, default=1, help='Retry-After seconds sent with 429s')
+    parser.add_argument('--concurrency', type=int_list, default=[10], help='max_concurrent values, e.g. 10,30,60')
+    parser.add_argument('--request-delay', type=float_list, default=[0.0],
+                        help='request_delay values (0 disables the rate limiter)')
+    parser.add_argument('--page-size', type=int_list, default=[20], help='Listing page sizes')
+    parser.add_argument('--connector-limit', type=int_list, default=[100], help='TCPConnector limit values')
+    parser.add_argument('--limit-per-host', type=int_list, default=[30], help='TCPConnector limit_per_host values')
+    parser.add_argument('--output', default=None, help='Also write the results as JSON')
+    parser.add_argument('--child', default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        run_child(json.loads(args.child))
+        return
+
+    base_url = f"http://127.0.0.1:{args.port}"
+    server = start_mock_server(args)
+    results = []
+    try:
+        grid = itertools.product(args.concurrency, args.request_delay, args.page_size,
+                                 args.connector_limit, args.limit_per_host)
+        for concurrency, request_delay, page_size, connector_limit, limit_per_host in grid:
+            config = {'base_url': base_url, 'concurrency': concurrency, 'request_delay': request_delay,
+                      'page_size': page_size, 'connector_limit': connector_limit, 'limit_per_host': limit_per_host}
+            http_json(f"{base_url}/__reset", method='POST')
+
+            returncode, stdout, stderr, _, peak_rss = run_measured(
+                [sys.executable, '-m', 'benchmarks.scrape', '--child', json.dumps(config)])
+            if returncode != 0:
+                logger.error(f"Benchmark run failed for {config}:\n{stderr[-2000:]}")
+                continue
+
+            measured = json.loads(stdout.strip().splitlines()[-1])
+            stats = http_json(f"{base_url}/__stats")
+            errors = sum(count for status, count in stats['statuses'].items() if not status.startswith('2'))
+            if stats['statuses'].get('429') and not measured['retry_after_backoffs']:
+                logger.error(f"The mock's 429 responses never drove a Retry-After backoff for {config}; "
+                             f"the scraper could not parse their Retry-After header")
+            results.append({
+                **{k: v for k, v in config.items() if k != 'base_url'},
+                **measured,
+                'records_per_sec': measured['records'] / measured['elapsed'],
+                'requests': sum(stats['requests'].values()),
+                'errors': errors,
+                'peak_rss_mb': peak_rss,
+            })
+    finally:
+        server.terminate()
+        server.wait()
+
+    logger.info("=" * 100)
+    logger.info(f"SCRAPER BENCHMARK: {args.records} records, {args.latency_ms:.0f} ms latency, "
+                f"{args.error_429:.1%} 429s, {args.error_5xx:.1%} 5xx")
+    logger.info("=" * 100)
+    logger.info(f"{'conc':>5} {'delay':>6} {'page':>5} {'limit':>6} {'/host':>6} {'records':>8} {'rec/s':>8} "
+                f"{'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>7} {'retries':>8} {'RSS MB':>7}")
+    for r in results:
+        logger.info(f"{r['concurrency']:>5} {r['request_delay']:>6.2f} {r['page_size']:>5} {r['connector_limit']:>6} "
+                    f"{r['limit_per_host']:>6} {r['records']:>8} {r['records_per_sec']:>8.1f} {r['p50_ms']:>8.1f} "
+                    f"{r['p95_ms']:>8.1f} {r['p99_ms']:>8.1f} {r['errors']:>7} {r['retries']:>8} {r['peak_rss_mb']:>7.1f}")
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        logger.info(f"Results saved to {args.output}")
+
+if __name__ == "__main__":
+    main()
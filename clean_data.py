@@ -4,18 +4,218 @@ Data cleaner for startup_details.json
 Removes unnecessary fields and keeps only essential startup data
 """
 
+import argparse
+import hashlib
 import json
 import logging
+import math
+import os
 import re
-from typing import Dict, List, Any, Union
+import time
+from collections import Counter, OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, List, Any, Iterable, Iterator, Optional, Tuple, Union
+
+from compact_format import write_compact
+from json_codec import BACKENDS, JsonCodec, get_codec
+from jsonl_store import JsonArrayWriter, iter_json_array
+from metrics import Metrics, finish_metrics, start_metrics
+from snapshot_store import write_snapshot
+from startup_db import StartupDatabase
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class DataSummary:
+    """Mergeable running statistics of cleaned startups, updated one startup at a time
+    
+    Every accumulator is a plain count, so summaries built in separate worker
+    processes can be combined with merge() and the result is the same as a
+    single pass over all records. Text length quantiles are exact: lengths
+    are kept as a histogram rather than a sample.
+    """
+    
+    # Option-style fields summarised as histograms of their labels
+    HISTOGRAM_FIELDS = ('categories', 'tags', 'trl', 'fundingStage', 'status', 'lookingFor')
+    LENGTH_QUANTILES = (0.5, 0.9, 0.99)
+    
+    def __init__(self):
+        self.total_startups = 0
+        self.field_counts = {}
+        self.filled_counts = {}
+        self.type_counts = {}
+        self.size_counts = Counter()
+        self.histograms = {field: Counter() for field in self.HISTOGRAM_FIELDS}
+        self.text_lengths = {}
+        self.failures = Counter()
+    
+    @staticmethod
+    def is_filled(value: Any) -> bool:
+        return value is not None and value != '' and value != [] and value != {}
+    
+    @staticmethod
+    def histogram_key(item: Any) -> Any:
+        if isinstance(item, dict):
+            return item.get('name', item.get('label', item.get('value')))
+        return item
+    
+    def add(self, startup: Dict[str, Any]) -> None:
+        self.total_startups += 1
+        self.size_counts[len(startup)] += 1
+        for field, value in startup.items():
+            self.field_counts[field] = self.field_counts.get(field, 0) + 1
+            if self.is_filled(value):
+                self.filled_counts[field] = self.filled_counts.get(field, 0) + 1
+            types = self.type_counts.setdefault(field, Counter())
+            types[type(value).__name__] += 1
+            
+            # Histogram fields are counted by value even when they hold a plain string
+            if field in self.histograms:
+                items = value if isinstance(value, list) else [value]
+                self.histograms[field].update(self.histogram_key(item) for item in items)
+            elif isinstance(value, str):
+                lengths = self.text_lengths.setdefault(field, Counter())
+                lengths[len(value)] += 1
+    
+    def add_failure(self, kind: str) -> None:
+        """Count a startup that produced no record, e.g. 'error' or 'empty'"""
+        self.failures[kind] += 1
+    
+    def merge(self, other: 'DataSummary') -> 'DataSummary':
+        """Fold another summary (e.g. from a worker process) into this one"""
+        self.total_startups += other.total_startups
+        self.size_counts.update(other.size_counts)
+        self.failures.update(other.failures)
+        for field, count in other.field_counts.items():
+            self.field_counts[field] = self.field_counts.get(field, 0) + count
+        for field, count in other.filled_counts.items():
+            self.filled_counts[field] = self.filled_counts.get(field, 0) + count
+        for field, types in other.type_counts.items():
+            self.type_counts.setdefault(field, Counter()).update(types)
+        for field, lengths in other.text_lengths.items():
+            self.text_lengths.setdefault(field, Counter()).update(lengths)
+        for field, histogram in other.histograms.items():
+            self.histograms.setdefault(field, Counter()).update(histogram)
+        return self
+    
+    def length_stats(self, lengths: Counter) -> Dict[str, Any]:
+        count = sum(lengths.values())
+        ordered = sorted(lengths.items())
+        stats = {
+            "count": count,
+            "min": ordered[0][0],
+            "max": ordered[-1][0],
+            "mean": round(sum(length * n for length, n in ordered) / count, 1),
+        }
+        for q in self.LENGTH_QUANTILES:
+            rank = max(1, math.ceil(q * count))
+            seen = 0
+            for length, n in ordered:
+                seen += n
+                if seen >= rank:
+                    stats[f"p{round(q * 100)}"] = length
+                    break
+        return stats
+    
+    def to_dict(self) -> Dict[str, Any]:
+        if not self.total_startups:
+            return {"total": 0, "failures": dict(self.failures)}
+        
+        return {
+            "total_startups": self.total_startups,
+            "fields_per_startup": self.size_counts.most_common(1)[0][0],
+            "common_fields": sorted(self.field_counts.keys()),
+            "field_usage": self.field_counts,
+            "sample_startup": {field: types.most_common(1)[0][0] for field, types in self.type_counts.items()},
+            "fill_rates": {field: round(self.filled_counts.get(field, 0) / self.total_startups, 4)
+                           for field in self.field_counts},
+            # Ties broken by label, so merged and single-pass summaries write the same file
+            "histograms": {field: dict(sorted(histogram.items(), key=lambda kv: (-kv[1], str(kv[0]))))
+                           for field, histogram in self.histograms.items() if histogram},
+            "text_lengths": {field: self.length_stats(lengths) for field, lengths in self.text_lengths.items()},
+            "failures": {"error": self.failures.get("error", 0), "empty": self.failures.get("empty", 0),
+                         **self.failures},
+        }
+
+class TextCleanCache:
+    """Bounded LRU of clean_html_text results, optionally persisted between runs
+    
+    Many values (statuses, funding stages, TRL labels, empty strings) repeat
+    across startups, and on a re-run most texts are unchanged. A saved cache
+    is tagged with the cleaner's rules fingerprint and ignored if the rules
+    have changed since.
+    """
+    
+    def __init__(self, max_entries: int = 50000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    def get(self, text: str) -> Optional[str]:
+        cleaned = self.entries.get(text)
+        if cleaned is None:
+            self.misses += 1
+            return None
+        self.entries.move_to_end(text)
+        self.hits += 1
+        return cleaned
+    
+    def put(self, text: str, cleaned: str) -> None:
+        self.entries[text] = cleaned
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+    
+    def load(self, filename: str, fingerprint: str) -> int:
+        """Load saved entries if they were produced by the same patterns"""
+        try:
+            with open(filename, 'r', encoding='utf-8') as f:
+                saved = json.load(f)
+        except FileNotFoundError:
+            return 0
+        
+        if saved.get('fingerprint') != fingerprint:
+            logger.info(f"Ignoring text cache {filename}: cleaning rules have changed")
+            return 0
+        
+        for text, cleaned in saved['entries'][-self.max_entries:]:
+            self.put(text, cleaned)
+        return len(self.entries)
+    
+    def save(self, filename: str, fingerprint: str) -> None:
+        with open(filename, 'w', encoding='utf-8') as f:
+            json.dump({'fingerprint': fingerprint, 'entries': list(self.entries.items())}, f, ensure_ascii=False)
+    
+    def stats(self) -> str:
+        lookups = self.hits + self.misses
+        rate = self.hits / lookups * 100 if lookups else 0.0
+        return f"{self.hits} hits / {self.misses} misses ({rate:.1f}% hit rate, {len(self.entries)} entries)"
+
 class DataCleaner:
     """Clean startup data by removing unnecessary fields"""
     
-    def __init__(self):
+    # Part of the text cache fingerprint: bump whenever clean_html_text_uncached
+    # changes in a way its patterns do not show (e.g. new replacement strings)
+    TEXT_CLEAN_VERSION = 1
+    
+    # Methods timed by enable_profiling(), and the stage each is reported as.
+    # Stages nest: record > text > text_uncached > strip_html > strip_html_fallback
+    PROFILED_STAGES = {
+        'clean_startup': 'record',
+        'is_image_object': 'image_check',
+        'clean_html_text': 'text',
+        'clean_html_text_uncached': 'text_uncached',
+        'strip_html': 'strip_html',
+        'strip_html_sequential': 'strip_html_fallback',
+    }
+    
+    def __init__(self, text_cache_size: int = 0):
+        # stage -> [CPU seconds, calls], only filled once enable_profiling() is called
+        self.stage_cpu: Optional[Dict[str, List[float]]] = None
+        
+        # Memoized clean_html_text results (0, the default, disables the cache; the CLI turns it on)
+        self.text_cache = TextCleanCache(text_cache_size) if text_cache_size else None
+        
         # Fields to completely remove
         self.remove_fields = {
             # Meta and system fields
@@ -72,6 +272,7 @@ class DataCleaner:
             r'</a>',               # Closing a tags
             r'data-block-key="[^"]*"',  # Wagtail block keys
         ]
+        self.compile_html_patterns()
         
         # Keep only these essential fields (whitelist approach for top level)
         self.essential_fields = {
@@ -88,23 +289,149 @@ class DataCleaner:
             'resolutionStatus', 'scientificPublications', 'publicationLinks',
             'certifications'
         }
+        self.compile_projection()
+    
+    def enable_profiling(self) -> None:
+        """Record per-stage CPU time in stage_cpu
+        
+        The profiled methods are wrapped on this instance only, so an
+        unprofiled cleaner pays nothing. Wrappers are dropped when the cleaner
+        is pickled and rebuilt in the worker, which profiles into its own
+        stage_cpu (see take_stage_cpu).
+        """
+        self.stage_cpu = {}
+        for method_name, stage in self.PROFILED_STAGES.items():
+            # Looked up on the class so a subclass override is profiled, and calling this twice never double-wraps
+            method = getattr(type(self), method_name).__get__(self)
+            setattr(self, method_name, self._profiled(method, stage))
+    
+    def _profiled(self, method, stage: str):
+        stage_cpu = self.stage_cpu
+        process_time = time.process_time
+        
+        def profiled(*args, **kwargs):
+            start = process_time()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                totals = stage_cpu.get(stage)
+                if totals is None:
+                    totals = stage_cpu[stage] = [0.0, 0]
+                totals[0] += process_time() - start
+                totals[1] += 1
+        return profiled
+    
+    def take_stage_cpu(self) -> Dict[str, List[float]]:
+        """Return the stage times collected so far and start counting from zero"""
+        if self.stage_cpu is None:
+            return {}
+        taken = {stage: list(totals) for stage, totals in self.stage_cpu.items()}
+        self.stage_cpu.clear()
+        return taken
+    
+    def merge_stage_cpu(self, stage_cpu: Dict[str, List[float]]) -> None:
+        """Add stage times from a worker process"""
+        if self.stage_cpu is None:
+            return
+        for stage, (seconds, calls) in stage_cpu.items():
+            totals = self.stage_cpu.setdefault(stage, [0.0, 0])
+            totals[0] += seconds
+            totals[1] += calls
+    
+    def collect_metrics(self, metrics: Metrics) -> None:
+        """Metrics collector exporting stage CPU times and text cache counts"""
+        for stage, (seconds, calls) in list((self.stage_cpu or {}).items()):
+            metrics.set('cleaner_stage_cpu_seconds', seconds, stage=stage)
+            metrics.set('cleaner_stage_calls', calls, stage=stage)
+        if self.text_cache is not None:
+            metrics.set('cleaner_text_cache_hits', self.text_cache.hits)
+            metrics.set('cleaner_text_cache_misses', self.text_cache.misses)
+    
+    def __getstate__(self) -> Dict[str, Any]:
+        state = self.__dict__.copy()
+        for method_name in self.PROFILED_STAGES:
+            state.pop(method_name, None)
+        return state
+    
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        if self.stage_cpu is not None:
+            self.enable_profiling()
+    
+    def compile_projection(self) -> None:
+        """Precompute the top-level projection (call again after changing the field sets)
+        
+        A top-level field survives clean_startup only if it is essential and not
+        removed, so everything else can be skipped before any cleaning is done.
+        """
+        self.projected_fields = frozenset(self.essential_fields - self.remove_fields)
+        self.image_indicator_keys = tuple(self.image_indicators)
+    
+    def compile_html_patterns(self) -> None:
+        """Compile html_patterns into single-pass tokenizers (call again after changing them)
+        
+        The tokenizer cannot match across a '<', so on well-formed HTML one
+        scan removes exactly what applying the patterns one by one would. If
+        the start of any pattern survives the scan, the markup was nested or
+        broken in a way where pattern order matters.
+        """
+        strict = [p.replace('[^>]*', '[^<>]*').replace('[^"]*', '[^"<]*') for p in self.html_patterns]
+        openers = [re.split(r'\[\^', p, maxsplit=1)[0] for p in self.html_patterns]
+        self.html_tokenizer = re.compile('|'.join(strict), re.IGNORECASE)
+        self.html_leftovers = re.compile('|'.join(openers), re.IGNORECASE)
+        self.whitespace_re = re.compile(r'\s+')
+        self.semicolon_re = re.compile(r'\s*;\s*')
+        self.bullet_re = re.compile(r'^\s*•\s*', re.MULTILINE)
+    
+    def strip_html_sequential(self, text: str) -> str:
+        """Apply html_patterns one at a time (reference behaviour for malformed markup)"""
+        for pattern in self.html_patterns:
+            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+        return text
+    
+    def strip_html(self, text: str) -> str:
+        """Remove HTML patterns in one scan, falling back to the sequential path if needed"""
+        stripped = self.html_tokenizer.sub('', text)
+        
+        # A surviving pattern start means the one-pass result may differ, so redo it the slow way
+        if self.html_leftovers.search(stripped):
+            return self.strip_html_sequential(text)
+        return stripped
+    
+    def text_cache_fingerprint(self) -> str:
+        """Identify the cleaning rules a cached text result was produced with"""
+        rules = [self.TEXT_CLEAN_VERSION, self.html_patterns,
+                 [regex.pattern for regex in (self.whitespace_re, self.semicolon_re, self.bullet_re)]]
+        return hashlib.sha256(json.dumps(rules).encode('utf-8')).hexdigest()
     
     def clean_html_text(self, text: str) -> str:
+        """Remove HTML tags and clean up text, memoized through text_cache"""
+        if not isinstance(text, str) or self.text_cache is None:
+            return self.clean_html_text_uncached(text)
+        
+        cleaned = self.text_cache.get(text)
+        if cleaned is None:
+            cleaned = self.clean_html_text_uncached(text)
+            self.text_cache.put(text, cleaned)
+        return cleaned
+    
+    def clean_html_text_uncached(self, text: str) -> str:
         """Remove HTML tags and clean up text"""
         if not isinstance(text, str):
             return text
         
         # Remove all HTML patterns
-        for pattern in self.html_patterns:
-            text = re.sub(pattern, '', text, flags=re.IGNORECASE | re.MULTILINE)
+        text = self.strip_html(text)
         
         # Clean up whitespace and formatting
-        text = re.sub(r'\s+', ' ', text)  # Replace multiple whitespace with single space
+        text = self.whitespace_re.sub(' ', text)  # Replace multiple whitespace with single space
         text = text.strip()  # Remove leading/trailing whitespace
         
         # Convert list-like text to proper bullet points
-        text = re.sub(r'\s*;\s*', '\n• ', text)  # Convert semicolons to bullet points
-        text = re.sub(r'^\s*•\s*', '• ', text, flags=re.MULTILINE)  # Clean up bullet points
+        if ';' in text:
+            text = self.semicolon_re.sub('\n• ', text)  # Convert semicolons to bullet points
+        if '•' in text:
+            text = self.bullet_re.sub('• ', text)  # Clean up bullet points
         
         return text
     
@@ -114,8 +441,13 @@ class DataCleaner:
             return False
         
         # If it has typical image fields, it's probably an image
-        obj_keys = set(obj.keys())
-        return len(obj_keys.intersection(self.image_indicators)) >= 2
+        matches = 0
+        for key in self.image_indicator_keys:
+            if key in obj:
+                matches += 1
+                if matches >= 2:
+                    return True
+        return False
     
     def clean_value(self, value: Any) -> Any:
         """Clean a single value recursively"""
@@ -166,20 +498,44 @@ class DataCleaner:
         return cleaned
     
     def clean_startup(self, startup: Dict[str, Any]) -> Dict[str, Any]:
-        """Clean a single startup entry"""
-        # First apply general cleaning
-        cleaned = self.clean_dict(startup)
+        """Clean a single startup entry
+        
+        Equivalent to clean_dict followed by the essential_fields whitelist,
+        but non-essential branches are dropped before they are cleaned.
+        """
+        if self.is_image_object(startup):
+            return {}
         
-        # Then apply whitelist filtering for top-level fields
-        final_cleaned = {}
-        for key, value in cleaned.items():
-            if key in self.essential_fields:
-                final_cleaned[key] = value
+        cleaned = {}
+        for key, value in startup.items():
+            # Whitelist first: only projected fields are worth cleaning
+            if key not in self.projected_fields or value is None:
+                continue
+            
+            cleaned_value = self.clean_value(value)
+            
+            # Only add if the cleaned value is not None/empty
+            if cleaned_value is not None:
+                if isinstance(cleaned_value, (list, dict)):
+                    if cleaned_value:  # Only add non-empty collections
+                        cleaned[key] = cleaned_value
+                else:
+                    cleaned[key] = cleaned_value
         
-        return final_cleaned
+        return cleaned
     
-    def clean_all_startups(self, startups: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Clean all startup entries"""
+    def clean_all_startups(self, startups: List[Dict[str, Any]], workers: int = 1,
+                           chunk_size: int = 50, summary: Optional[DataSummary] = None) -> List[Dict[str, Any]]:
+        """Clean all startup entries
+        
+        With workers > 1 the startups are split into chunks of chunk_size and
+        cleaned in a process pool. Results keep input order, and a failing
+        record is logged and skipped without affecting the rest of its chunk.
+        If a summary is given, it is updated as records are cleaned.
+        """
+        if workers > 1:
+            return self.clean_all_startups_parallel(startups, workers, chunk_size, summary)
+        
         cleaned_startups = []
         
         logger.info(f"Cleaning {len(startups)} startup entries...")
@@ -189,52 +545,271 @@ class DataCleaner:
                 cleaned = self.clean_startup(startup)
                 if cleaned:  # Only add non-empty results
                     cleaned_startups.append(cleaned)
+                if summary is not None:
+                    if cleaned:
+                        summary.add(cleaned)
+                    else:
+                        summary.add_failure('empty')
                 
                 if (i + 1) % 50 == 0:
                     logger.info(f"Cleaned {i + 1}/{len(startups)} startups")
                     
             except Exception as e:
                 logger.error(f"Error cleaning startup {i}: {e}")
+                if summary is not None:
+                    summary.add_failure('error')
                 continue
         
         logger.info(f"Cleaning completed. {len(cleaned_startups)} startups cleaned")
         return cleaned_startups
     
-    def get_data_summary(self, startups: List[Dict[str, Any]]) -> Dict[str, Any]:
-        """Get summary statistics of the cleaned data"""
-        if not startups:
-            return {"total": 0}
+    def clean_all_startups_parallel(self, startups: List[Dict[str, Any]], workers: int,
+                                    chunk_size: int = 50,
+                                    summary: Optional[DataSummary] = None) -> List[Dict[str, Any]]:
+        """Clean all startup entries in a process pool, chunk by chunk
         
-        total_startups = len(startups)
+        Each chunk is summarised in its worker and the partial summaries are
+        merged into summary, so no second pass over the results is needed.
+        """
+        cleaned_startups = []
+        chunks = [startups[i:i + chunk_size] for i in range(0, len(startups), chunk_size)]
         
-        # Count field usage
-        field_counts = {}
-        for startup in startups:
-            for field in startup.keys():
-                field_counts[field] = field_counts.get(field, 0) + 1
+        logger.info(f"Cleaning {len(startups)} startup entries with {workers} workers "
+                    f"({len(chunks)} chunks of up to {chunk_size})...")
         
-        # Sample startup for structure
-        sample = startups[0] if startups else {}
+        # Workers get a copy of this cleaner, so customised patterns and fields carry over
+        with ProcessPoolExecutor(max_workers=workers, initializer=set_process_cleaner,
+                                 initargs=(self,)) as executor:
+            done = 0
+            # map() yields chunk results in submission order
+            for chunk_results, chunk_summary, chunk_stage_cpu in executor.map(clean_startup_chunk, chunks):
+                if summary is not None:
+                    summary.merge(chunk_summary)
+                self.merge_stage_cpu(chunk_stage_cpu)
+                for cleaned, error in chunk_results:
+                    if error is not None:
+                        logger.error(f"Error cleaning startup {done}: {error}")
+                    elif cleaned:  # Only add non-empty results
+                        cleaned_startups.append(cleaned)
+                    done += 1
+                
+                logger.info(f"Cleaned {done}/{len(startups)} startups")
         
-        return {
-            "total_startups": total_startups,
-            "fields_per_startup": len(sample.keys()),
-            "common_fields": sorted(field_counts.keys()),
-            "field_usage": field_counts,
-            "sample_startup": {k: type(v).__name__ for k, v in sample.items()}
-        }
+        logger.info(f"Cleaning completed. {len(cleaned_startups)} startups cleaned")
+        return cleaned_startups
+    
+    def clean_startup_stream(self, startups: Iterable[Dict[str, Any]],
+                             summary: Optional[DataSummary] = None) -> Iterator[Dict[str, Any]]:
+        """Clean startups lazily, one at a time, with the same error handling as clean_all_startups"""
+        logger.info("Cleaning startup entries as they are read...")
+        
+        count = 0
+        for i, startup in enumerate(startups):
+            try:
+                cleaned = self.clean_startup(startup)
+            except Exception as e:
+                logger.error(f"Error cleaning startup {i}: {e}")
+                if summary is not None:
+                    summary.add_failure('error')
+                continue
+            
+            if summary is not None:
+                if cleaned:
+                    summary.add(cleaned)
+                else:
+                    summary.add_failure('empty')
+            if cleaned:  # Only yield non-empty results
+                count += 1
+                yield cleaned
+            
+            if (i + 1) % 1000 == 0:
+                logger.info(f"Cleaned {i + 1} startups")
+        
+        logger.info(f"Cleaning completed. {count} startups cleaned")
+    
+    def get_data_summary(self, startups: List[Dict[str, Any]]) -> Dict[str, Any]:
+        """Get summary statistics of the cleaned data"""
+        summary = DataSummary()
+        for startup in startups:
+            summary.add(startup)
+        return summary.to_dict()
+
+# One cleaner per worker process, set by the pool initializer or built on first use
+_process_cleaner = None
+
+def set_process_cleaner(cleaner: DataCleaner) -> None:
+    """Process pool initializer installing the cleaner used by this worker"""
+    global _process_cleaner
+    _process_cleaner = cleaner
+    cleaner.take_stage_cpu()  # A forked worker inherits the parent's totals; count only its own work
+
+def clean_startup_record(startup: Dict[str, Any]) -> Dict[str, Any]:
+    """Clean a single startup with a per-process DataCleaner (picklable for process pools)"""
+    global _process_cleaner
+    if _process_cleaner is None:
+        _process_cleaner = DataCleaner(text_cache_size=0)
+    return _process_cleaner.clean_startup(startup)
+
+def clean_startup_chunk(chunk: List[Dict[str, Any]]) -> Tuple[List[Tuple[Optional[Dict[str, Any]], Optional[str]]],
+                                                              DataSummary, Dict[str, List[float]]]:
+    """Clean a chunk of startups in a worker
+    
+    Returns (cleaned, error) per record, the chunk's summary and the stage
+    CPU times spent on it (empty unless the cleaner is profiling).
+    """
+    results = []
+    summary = DataSummary()
+    for startup in chunk:
+        try:
+            cleaned = clean_startup_record(startup)
+        except Exception as e:
+            results.append((None, str(e)))
+            summary.add_failure('error')
+            continue
+        results.append((cleaned, None))
+        if cleaned:
+            summary.add(cleaned)
+        else:
+            summary.add_failure('empty')
+    return results, summary, _process_cleaner.take_stage_cpu()
+
+def clean_streaming(cleaner: DataCleaner, input_file: str, output_file: str,
+                    codec: Optional[JsonCodec] = None) -> Dict[str, Any]:
+    """Clean a JSON array file item by item in constant memory, returning counts and summary"""
+    summary = DataSummary()
+    read_count = 0
+    
+    def read_startups() -> Iterator[Dict[str, Any]]:
+        nonlocal read_count
+        for startup in iter_json_array(input_file):
+            read_count += 1
+            yield startup
+    
+    with JsonArrayWriter(output_file, codec) as writer:
+        for cleaned in cleaner.clean_startup_stream(read_startups(), summary):
+            writer.write(cleaned)
+    
+    return {"read": read_count, "cleaned": writer.count, "summary": summary}
+
+def export_sqlite(output_file: str, db_path: Optional[str]) -> None:
+    """Bulk-load the cleaned output into the indexed SQLite store, if requested"""
+    if not db_path:
+        return
+    db = StartupDatabase(db_path)
+    try:
+        count = db.rebuild(iter_json_array(output_file))
+    finally:
+        db.close()
+    logger.info(f"✅ SQLite export: {count} startups in {db_path}")
+
+def export_compact(output_file: str, compact_file: Optional[str]) -> None:
+    """Write the cleaned output in the normalized compact format, if requested"""
+    if not compact_file:
+        return
+    count = write_compact(iter_json_array(output_file), compact_file)
+    logger.info(f"✅ Compact export: {count} startups in {compact_file} "
+                f"({os.path.getsize(compact_file) / os.path.getsize(output_file):.0%} of {output_file})")
+
+def export_snapshot(output_file: str, snapshot_file: Optional[str]) -> None:
+    """Write the cleaned output as a compressed, id-indexed snapshot, if requested"""
+    if not snapshot_file:
+        return
+    count = write_snapshot(iter_json_array(output_file), snapshot_file)
+    logger.info(f"✅ Snapshot export: {count} startups in {snapshot_file}")
+
+def log_text_cache(cleaner: DataCleaner, cache_file: Optional[str]) -> None:
+    """Report text cache effectiveness and persist it if requested"""
+    if cleaner.text_cache is None:
+        return
+    logger.info(f"✅ Text cache: {cleaner.text_cache.stats()}")
+    if cache_file:
+        cleaner.text_cache.save(cache_file, cleaner.text_cache_fingerprint())
+        logger.info(f"✅ Text cache saved to {cache_file}")
 
 def main():
     """Main function to clean the startup data"""
-    input_file = "startup_details.json"
-    output_file = "startup_details_clean.json"
-    summary_file = "data_summary.json"
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--input', default='startup_details.json', help='Raw startup JSON array')
+    parser.add_argument('--output', default='startup_details_clean.json', help='Cleaned JSON output')
+    parser.add_argument('--summary', default='data_summary.json', help='Summary JSON output')
+    parser.add_argument('--stream', action='store_true',
+                        help='Parse, clean and write one startup at a time so memory stays flat for any input size')
+    parser.add_argument('--workers', type=int, default=1,
+                        help='Clean in a pool of this many processes (0 = one per CPU); ignored with --stream')
+    parser.add_argument('--chunk-size', type=int, default=50, help='Startups per worker task with --workers')
+    parser.add_argument('--text-cache', default=None,
+                        help='File to load/save memoized text cleaning results between runs')
+    parser.add_argument('--text-cache-size', type=int, default=None,
+                        help='Maximum memoized texts (0 disables the cache; default 50000, or off with --stream '
+                             'unless --text-cache is given, since a full cache outgrows the streaming memory use)')
+    parser.add_argument('--sqlite', default=None,
+                        help='Also load the cleaned output into this SQLite database (see startup_db.py)')
+    parser.add_argument('--compact-output', default=None,
+                        help='Also write the cleaned output in the normalized compact format (see compact_format.py)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Profile CPU time per cleaning stage and write it here '
+                             '(.prom/.txt for Prometheus text, else JSON)')
+    parser.add_argument('--metrics-interval', type=float, default=0,
+                        help='Also rewrite --metrics-file every this many seconds during the run')
+    parser.add_argument('--snapshot', default=None,
+                        help='Also write the cleaned output as a compressed JSONL snapshot with an id index '
+                             '(see snapshot_store.py)')
+    parser.add_argument('--json-backend', choices=BACKENDS, default='auto',
+                        help="JSON library for reading the input and writing the output (auto: orjson if "
+                             "installed); 'stdlib' keeps output byte-identical to earlier versions")
+    args = parser.parse_args()
+    
+    if args.text_cache and not args.stream and (args.workers or os.cpu_count() or 1) > 1:
+        parser.error("--text-cache needs --workers 1 or --stream: worker processes keep their own caches")
+    
+    text_cache_size = args.text_cache_size
+    if text_cache_size is None:
+        text_cache_size = 0 if args.stream and not args.text_cache else 50000
+    
+    input_file = args.input
+    output_file = args.output
+    summary_file = args.summary
+    
+    metrics, metrics_dumper = start_metrics(args.metrics_file, args.metrics_interval)
+    codec = get_codec(args.json_backend)
     
     try:
+        cleaner = DataCleaner(text_cache_size=text_cache_size)
+        if metrics.enabled:
+            cleaner.enable_profiling()
+            metrics.add_collector(cleaner.collect_metrics)
+        if cleaner.text_cache is not None and args.text_cache:
+            loaded = cleaner.text_cache.load(args.text_cache, cleaner.text_cache_fingerprint())
+            logger.info(f"Loaded {loaded} memoized texts from {args.text_cache}")
+        
+        if args.stream:
+            logger.info(f"Streaming data from {input_file} to {output_file}")
+            result = clean_streaming(cleaner, input_file, output_file, codec)
+            summary = result["summary"].to_dict()
+            
+            logger.info(f"Saving data summary to {summary_file}")
+            with open(summary_file, 'w', encoding='utf-8') as f:
+                json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
+            
+            logger.info("=" * 50)
+            logger.info("DATA CLEANING SUMMARY")
+            logger.info("=" * 50)
+            logger.info(f"✅ Original records: {result['read']}")
+            logger.info(f"✅ Cleaned records: {result['cleaned']}")
+            logger.info(f"✅ Fields per startup: {summary.get('fields_per_startup', 0)}")
+            logger.info(f"✅ Output file: {output_file}")
+            logger.info(f"✅ Summary file: {summary_file}")
+            log_text_cache(cleaner, args.text_cache)
+            export_sqlite(output_file, args.sqlite)
+            export_compact(output_file, args.compact_output)
+            export_snapshot(output_file, args.snapshot)
+            logger.info("\n🎉 Data cleaning completed successfully!")
+            return
+        
         # Load the raw data
         logger.info(f"Loading data from {input_file}")
-        with open(input_file, 'r', encoding='utf-8') as f:
-            raw_data = json.load(f)
+        with open(input_file, 'rb') as f:
+            raw_data = codec.loads(f.read())
         
         if not raw_data:
             logger.error("No data found in input file")
@@ -243,16 +818,18 @@ def main():
         logger.info(f"Loaded {len(raw_data)} startup records")
         
         # Clean the data
-        cleaner = DataCleaner()
-        cleaned_data = cleaner.clean_all_startups(raw_data)
+        workers = args.workers or os.cpu_count() or 1
+        data_summary = DataSummary()
+        cleaned_data = cleaner.clean_all_startups(raw_data, workers=workers, chunk_size=args.chunk_size,
+                                                  summary=data_summary)
         
         # Save cleaned data
         logger.info(f"Saving cleaned data to {output_file}")
         with open(output_file, 'w', encoding='utf-8') as f:
-            json.dump(cleaned_data, f, indent=2, ensure_ascii=False, default=str)
+            f.write(codec.dumps_pretty(cleaned_data))
         
         # Generate and save summary
-        summary = cleaner.get_data_summary(cleaned_data)
+        summary = data_summary.to_dict()
         logger.info(f"Saving data summary to {summary_file}")
         with open(summary_file, 'w', encoding='utf-8') as f:
             json.dump(summary, f, indent=2, ensure_ascii=False, default=str)
@@ -266,6 +843,11 @@ def main():
         logger.info(f"✅ Fields per startup: {summary['fields_per_startup']}")
         logger.info(f"✅ Output file: {output_file}")
         logger.info(f"✅ Summary file: {summary_file}")
+        if workers == 1:
+            log_text_cache(cleaner, args.text_cache)
+        export_sqlite(output_file, args.sqlite)
+        export_compact(output_file, args.compact_output)
+        export_snapshot(output_file, args.snapshot)
         
         if cleaned_data:
             logger.info("\n📋 Sample cleaned startup fields:")
@@ -279,6 +861,8 @@ def main():
     except Exception as e:
         logger.error(f"Error during cleaning: {e}")
         raise
+    finally:
+        finish_metrics(metrics, args.metrics_file, metrics_dumper)
 
 if __name__ == "__main__":
     main()
\ No newline at end of file
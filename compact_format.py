@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Compact, normalized storage format for startup records
+Repeated categories, tags, owners and {label, value} enumerations are stored
+once in per-field dictionaries and referenced by index from each record
+
+Examples:
+    python compact_format.py encode startup_details_clean.json startups.compact.json
+    python compact_format.py decode startups.compact.json startup_details_clean.json
+"""
+
+import argparse
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, List
+
+from jsonl_store import JsonArrayWriter, iter_json_array
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+FORMAT_VERSION = 'startups-compact/1'
+
+# Fields whose values are objects (or lists of objects) shared across many startups
+NORMALIZED_FIELDS = ('categories', 'tags', 'owners', 'lookingFor', 'partnerTypes',
+                     'trl', 'fundingStage', 'status', 'initiative')
+
+# Records keep fields that could not be normalized (e.g. a plain string) under this key
+LITERAL_KEY = '$literal'
+
+def canonical_key(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'))
+
+def intern_strings(value: Any) -> Any:
+    """Copy a JSON value with every string (keys and values) interned"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return {sys.intern(k): intern_strings(v) for k, v in value.items()}
+    if isinstance(value, list):
+        return [intern_strings(v) for v in value]
+    return value
+
+class CompactEncoder:
+    """Build per-field dictionaries while encoding records one at a time
+
+    Dictionary entries are keyed by their full canonical JSON rather than
+    their own id, so a renamed category simply gets a second entry and
+    decoding always reproduces the input exactly.
+    """
+
+    def __init__(self, fields: Iterable[str] = NORMALIZED_FIELDS):
+        self.fields = tuple(fields)
+        self.dictionaries: Dict[str, List[Any]] = {field: [] for field in self.fields}
+        self._indexes: Dict[str, Dict[str, int]] = {field: {} for field in self.fields}
+
+    def _ref(self, field: str, value: Dict[str, Any]) -> int:
+        key = canonical_key(value)
+        index = self._indexes[field].get(key)
+        if index is None:
+            index = len(self.dictionaries[field])
+            self._indexes[field][key] = index
+            self.dictionaries[field].append(value)
+        return index
+
+    def encode(self, record: Dict[str, Any]) -> Dict[str, Any]:
+        encoded = {}
+        literals = {}
+        for key, value in record.items():
+            if key not in self._indexes:
+                encoded[key] = value
+            elif isinstance(value, dict):
+                encoded[key] = self._ref(key, value)
+            elif isinstance(value, list) and all(isinstance(item, dict) for item in value):
+                encoded[key] = [self._ref(key, item) for item in value]
+            else:
+                # Keep key order: placeholder now, literal value restored on decode
+                encoded[key] = None
+                literals[key] = value
+        if literals:
+            encoded[LITERAL_KEY] = literals
+        return encoded
+
+    def document(self, records: List[Dict[str, Any]]) -> Dict[str, Any]:
+        return {
+            'format': FORMAT_VERSION,
+            'fields': list(self.fields),
+            'dictionaries': {field: entries for field, entries in self.dictionaries.items() if entries},
+            'records': records,
+        }
+
+class CompactStartups:
+    """Loaded compact file; records are rehydrated on access
+
+    Dictionary entries are interned once and shared by every record that
+    references them, so treat rehydrated nested objects as read-only.
+    """
+
+    def __init__(self, document: Dict[str, Any]):
+        if document.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact format: {document.get('format')!r}")
+        self.fields = frozenset(document['fields'])
+        self.dictionaries = {field: intern_strings(entries)
+                             for field, entries in document['dictionaries'].items()}
+        self.records = document['records']
+
+    @classmethod
+    def load(cls, filename: str) -> 'CompactStartups':
+        with open(filename, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, index: int) -> Dict[str, Any]:
+        return self.rehydrate(self.records[index])
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for record in self.records:
+            yield self.rehydrate(record)
+
+    def rehydrate(self, encoded: Dict[str, Any]) -> Dict[str, Any]:
+        literals = encoded.get(LITERAL_KEY, {})
+        record = {}
+        for key, value in encoded.items():
+            if key == LITERAL_KEY:
+                continue
+            if key not in self.fields:
+                record[key] = value
+            elif key in literals:
+                record[key] = literals[key]
+            elif isinstance(value, list):
+                entries = self.dictionaries[key]
+                record[key] = [entries[i] for i in value]
+            else:
+                record[key] = self.dictionaries[key][value]
+        return record
+
+def write_compact(records: Iterable[Dict[str, Any]], filename: str) -> int:
+    """Encode records and write them as a compact (unindented) JSON document"""
+    encoder = CompactEncoder()
+    encoded = [encoder.encode(record) for record in records]
+    with open(filename, 'w', encoding='utf-8') as f:
+        json.dump(encoder.document(encoded), f, ensure_ascii=False, separators=(',', ':'))
+    return len(encoded)
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+    encode_parser = commands.add_parser('encode', help='Convert a JSON array of startups to the compact format')
+    encode_parser.add_argument('input')
+    encode_parser.add_argument('output')
+    decode_parser = commands.add_parser('decode', help='Convert a compact file back to a pretty JSON array')
+    decode_parser.add_argument('input')
+    decode_parser.add_argument('output')
+    args = parser.parse_args()
+
+    if args.command == 'encode':
+        count = write_compact(iter_json_array(args.input), args.output)
+    else:
+        with JsonArrayWriter(args.output) as writer:
+            for record in CompactStartups.load(args.input):
+                writer.write(record)
+        count = writer.count
+
+    input_size = os.path.getsize(args.input)
+    output_size = os.path.getsize(args.output)
+    logger.info(f"✅ {count} startups: {args.input} ({input_size / 1024:.0f} KB) -> "
+                f"{args.output} ({output_size / 1024:.0f} KB, {output_size / input_size:.0%})")
+
+if __name__ == "__main__":
+    main()
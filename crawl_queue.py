@@ -0,0 +1,202 @@
+#!/usr/bin/env python3
+"""
+Durable SQLite work queue for sharded crawls
+Workers lease tasks for a limited time; expired leases are handed out again
+"""
+
+import json
+import logging
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Iterable, List, Tuple
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS tasks (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    kind TEXT NOT NULL,
+    key TEXT NOT NULL UNIQUE,
+    payload TEXT NOT NULL,
+    rank INTEGER NOT NULL DEFAULT 0,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    available_at REAL NOT NULL DEFAULT 0,
+    lease_owner TEXT,
+    lease_expires REAL,
+    last_error TEXT,
+    updated_at REAL
+);
+CREATE INDEX IF NOT EXISTS tasks_claimable ON tasks (kind, status);
+CREATE INDEX IF NOT EXISTS tasks_leases ON tasks (status, lease_expires);
+CREATE INDEX IF NOT EXISTS tasks_owner ON tasks (lease_owner, status);
+"""
+
+@dataclass
+class Task:
+    id: int
+    kind: str
+    key: str
+    payload: Dict[str, Any]
+    rank: int
+    attempts: int
+
+class CrawlQueue:
+    """Work queue shared by crawl workers through one SQLite file
+
+    A task is pending, leased, done or failed. claim() leases pending tasks,
+    and leased ones whose lease has expired, to one owner. complete() and
+    fail() only apply while the caller still holds the lease, so a worker
+    that stalled past its lease cannot overwrite the outcome of the worker
+    that took the task over.
+
+    WAL mode is used unless shared_fs is set: WAL needs shared memory and
+    does not work when workers on several machines open the file over a
+    network filesystem.
+    """
+
+    def __init__(self, path: str = 'crawl_queue.db', shared_fs: bool = False, busy_timeout: float = 60.0):
+        self.path = path
+        # Workers call in from one dedicated thread rather than the thread that opened it
+        self.conn = sqlite3.connect(path, timeout=busy_timeout, isolation_level=None, check_same_thread=False)
+        if not shared_fs:
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def _transaction(self) -> None:
+        # IMMEDIATE takes the write lock up front, so two workers never claim the same rows
+        self.conn.execute("BEGIN IMMEDIATE")
+
+    def add_many(self, tasks: Iterable[Tuple[str, str, Dict[str, Any], int]]) -> int:
+        """Queue (kind, key, payload, rank) tasks; keys already queued are ignored"""
+        now = time.time()
+        self._transaction()
+        try:
+            added = 0
+            for kind, key, payload, rank in tasks:
+                added += self.conn.execute(
+                    "INSERT OR IGNORE INTO tasks (kind, key, payload, rank, updated_at) VALUES (?, ?, ?, ?, ?)",
+                    (kind, key, json.dumps(payload, ensure_ascii=False), rank, now)
+                ).rowcount
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return added
+
+    def claim(self, owner: str, limit: int = 1, lease_seconds: float = 120.0) -> List[Task]:
+        """Lease up to limit tasks to owner: expired leases first, then listing pages, then details
+
+        Every lookup walks an index in insertion order, so a claim costs the
+        same with a hundred or a million tasks queued.
+        """
+        now = time.time()
+        self._transaction()
+        try:
+            rows = self.conn.execute("""
+                SELECT id, kind, key, payload, rank, attempts FROM tasks
+                WHERE status = 'leased' AND lease_expires < ? ORDER BY lease_expires LIMIT ?
+            """, (now, limit)).fetchall()
+            for kind in ('listing', 'detail'):
+                if len(rows) >= limit:
+                    break
+                rows += self.conn.execute("""
+                    SELECT id, kind, key, payload, rank, attempts FROM tasks
+                    WHERE kind = ? AND status = 'pending' AND available_at <= ? ORDER BY id LIMIT ?
+                """, (kind, now, limit - len(rows))).fetchall()
+
+            for row in rows:
+                self.conn.execute("""
+                    UPDATE tasks SET status = 'leased', lease_owner = ?, lease_expires = ?,
+                                     attempts = attempts + 1, updated_at = ?
+                    WHERE id = ?
+                """, (owner, now + lease_seconds, now, row[0]))
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return [Task(row[0], row[1], row[2], json.loads(row[3]), row[4], row[5] + 1) for row in rows]
+
+    def renew(self, owner: str, lease_seconds: float = 120.0) -> int:
+        """Extend every lease held by owner; returns how many are still held"""
+        now = time.time()
+        return self.conn.execute(
+            "UPDATE tasks SET lease_expires = ? WHERE lease_owner = ? AND status = 'leased'",
+            (now + lease_seconds, owner)
+        ).rowcount
+
+    def complete(self, owner: str, task_ids: List[int]) -> int:
+        """Mark tasks done, skipping any whose lease owner has since changed"""
+        if not task_ids:
+            return 0
+        now = time.time()
+        self._transaction()
+        try:
+            done = 0
+            for task_id in task_ids:
+                done += self.conn.execute(
+                    "UPDATE tasks SET status = 'done', lease_owner = NULL, lease_expires = NULL, updated_at = ? "
+                    "WHERE id = ? AND lease_owner = ? AND status = 'leased'",
+                    (now, task_id, owner)
+                ).rowcount
+            self.conn.execute("COMMIT")
+        except BaseException:
+            self.conn.execute("ROLLBACK")
+            raise
+        return done
+
+    def fail(self, owner: str, task: Task, error: str, retry_delay: float = 0.0, permanent: bool = False) -> None:
+        """Give a task back for a later attempt, or mark it failed for good"""
+        now = time.time()
+        status = 'failed' if permanent else 'pending'
+        self.conn.execute("""
+            UPDATE tasks SET status = ?, available_at = ?, last_error = ?, lease_owner = NULL,
+                             lease_expires = NULL, updated_at = ?
+            WHERE id = ? AND lease_owner = ? AND status = 'leased'
+        """, (status, now + retry_delay, error, now, task.id, owner))
+
+    def release(self, owner: str) -> int:
+        """Return owner's unfinished leases to the queue, e.g. on shutdown"""
+        return self.conn.execute(
+            "UPDATE tasks SET status = 'pending', lease_owner = NULL, lease_expires = NULL, "
+            "attempts = MAX(attempts - 1, 0) WHERE lease_owner = ? AND status = 'leased'",
+            (owner,)
+        ).rowcount
+
+    def retry_failed(self) -> int:
+        """Put every failed task back in the queue with a fresh attempt count"""
+        return self.conn.execute(
+            "UPDATE tasks SET status = 'pending', attempts = 0, available_at = 0 WHERE status = 'failed'"
+        ).rowcount
+
+    def counts(self) -> Dict[str, Dict[str, int]]:
+        """Number of tasks per kind and status"""
+        counts: Dict[str, Dict[str, int]] = {}
+        for kind, status, n in self.conn.execute("SELECT kind, status, COUNT(*) FROM tasks GROUP BY kind, status"):
+            counts.setdefault(kind, {})[status] = n
+        return counts
+
+    def is_drained(self) -> bool:
+        """True once no task is pending or leased"""
+        row = self.conn.execute("SELECT 1 FROM tasks WHERE status IN ('pending', 'leased') LIMIT 1").fetchone()
+        return row is None
+
+    def is_empty(self) -> bool:
+        return self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None
+
+    def failed(self, kind: str) -> List[Tuple[Task, str]]:
+        """Failed tasks of a kind with their last error, in rank order"""
+        rows = self.conn.execute(
+            "SELECT id, kind, key, payload, rank, attempts, last_error FROM tasks "
+            "WHERE kind = ? AND status = 'failed' ORDER BY rank, id",
+            (kind,)
+        ).fetchall()
+        return [(Task(row[0], row[1], row[2], json.loads(row[3]), row[4], row[5]), row[6]) for row in rows]
+
+    def ranks(self, kind: str) -> Dict[str, int]:
+        """key -> rank for every task of a kind"""
+        return dict(self.conn.execute("SELECT key, rank FROM tasks WHERE kind = ?", (kind,)))
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Crawl several knowledge-share.eu page types and locales in one run
+All targets share one HTTP session, connection pool and rate limiter; each
+target is written to its own JSONL (and compacted JSON) output
+
+Spec file format (JSON):
+    [
+        {"name": "startups-en", "type": "startups.StartUpPage", "locale": "en"},
+        {"name": "startups-it", "type": "startups.StartUpPage", "locale": "it",
+         "fields": ["title", "abstract", "categories"], "output": "startups_it.jsonl"}
+    ]
+
+Example:
+    python crawl_spec.py --spec crawl_spec.json
+    python crawl_spec.py --target startups.StartUpPage:en --target startups.StartUpPage:it
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import os
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+from jsonl_store import JsonlCheckpointWriter, compact_jsonl
+from metrics import finish_metrics, start_metrics
+from scraper import DetailQueue, StartupDetailsScraper
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+@dataclass
+class CrawlTarget:
+    """One listing to crawl: a Wagtail page type in a locale, with the listing fields to request"""
+    name: str
+    page_type: str
+    locale: str = 'en'
+    fields: List[str] = field(default_factory=list)  # Empty keeps get_startup_page's field list
+    output: Optional[str] = None
+
+    def __post_init__(self):
+        if self.output is None:
+            self.output = f"{self.name}.jsonl"
+
+    def listing_params(self) -> Dict[str, str]:
+        params = {'type': self.page_type, 'locale': self.locale}
+        if self.fields:
+            params['fields'] = ','.join(self.fields)
+        return params
+
+    @classmethod
+    def from_dict(cls, spec: Dict[str, Any]) -> 'CrawlTarget':
+        page_type = spec['type']
+        locale = spec.get('locale', 'en')
+        fields = spec.get('fields', [])
+        if isinstance(fields, str):
+            fields = fields.split(',')
+        name = spec.get('name') or f"{page_type.rsplit('.', 1)[-1].lower()}_{locale}"
+        return cls(name, page_type, locale, fields, spec.get('output'))
+
+def load_targets(path: str) -> List[CrawlTarget]:
+    """Read a JSON list of target specs (or {"targets": [...]})"""
+    with open(path, 'r', encoding='utf-8') as f:
+        spec = json.load(f)
+    if isinstance(spec, dict):
+        spec = spec['targets']
+    targets = [CrawlTarget.from_dict(entry) for entry in spec]
+    check_targets(targets)
+    return targets
+
+def check_targets(targets: List[CrawlTarget]) -> None:
+    """Raise ValueError unless every target has its own name, output file and listing
+
+    crawl_targets shares skip_ids and listing_ranks between targets, which
+    is only correct while no page id can belong to two of them.
+    """
+    names = [target.name for target in targets]
+    outputs = [os.path.normpath(target.output) for target in targets]
+    if len(set(names)) != len(names) or len(set(outputs)) != len(outputs):
+        raise ValueError("Crawl targets need distinct names and outputs")
+    listings = [(target.page_type, target.locale) for target in targets]
+    if len(set(listings)) != len(listings):
+        raise ValueError("Crawl targets need distinct (type, locale) pairs; "
+                         "put all wanted fields on one target instead")
+
+async def crawl_targets(scraper: StartupDetailsScraper, targets: List[CrawlTarget],
+                        resume: bool = False) -> Dict[str, int]:
+    """Crawl every target over the scraper's one session, returning records written per target
+
+    Each target gets its own listing producer, DetailQueue and pool of
+    detail workers, but all requests pass through the scraper's rate limiter
+    and semaphore. Both serve waiters in arrival order, so with equal pools
+    the targets take turns for request slots instead of one running ahead;
+    once a target runs out of work the others get its share.
+    """
+    writers = {}
+    for target in targets:
+        writers[target.name] = JsonlCheckpointWriter(target.output, resume=resume)
+        # Wagtail page ids are unique across types and locales
+        scraper.skip_ids |= writers[target.name].existing_ids
+
+    async def crawl(session, target: CrawlTarget) -> None:
+        queue = DetailQueue()
+        producer = asyncio.create_task(scraper.enqueue_startup_urls(session, queue, limit=scraper.PAGE_SIZE,
+                                                                    listing=target.listing_params()))
+        workers = [asyncio.create_task(scraper.detail_worker(session, queue, [], writers[target.name]))
+                   for _ in range(scraper.max_concurrent)]
+        try:
+            await queue.join()
+        finally:
+            for worker in workers:
+                worker.cancel()
+            await asyncio.gather(*workers, return_exceptions=True)
+        queued = await producer
+        logger.info(f"Target {target.name}: {writers[target.name].count} of {queued} queued records written")
+
+    try:
+        async with scraper.create_session() as session:
+            await asyncio.gather(*(crawl(session, target) for target in targets))
+    finally:
+        for writer in writers.values():
+            writer.close()
+
+    return {name: len(writer.existing_ids) + writer.count for name, writer in writers.items()}
+
+def parse_target(value: str) -> CrawlTarget:
+    """TYPE[:LOCALE] shorthand for --target"""
+    page_type, _, locale = value.partition(':')
+    return CrawlTarget.from_dict({'type': page_type, 'locale': locale or 'en'})
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--spec', default=None, help='JSON file listing the crawl targets')
+    parser.add_argument('--target', type=parse_target, action='append', default=[],
+                        help='Add a target as TYPE[:LOCALE], e.g. startups.StartUpPage:it (repeatable)')
+    parser.add_argument('--base-url', default=None, help='API origin to crawl instead of knowledge-share.eu')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent requests shared by all targets')
+    parser.add_argument('--request-delay', type=float, default=0.3,
+                        help='Starting delay between requests for the whole run (0 disables rate limiting)')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted run, skipping ids already in the targets\' JSONL files')
+    parser.add_argument('--no-compact', action='store_true',
+                        help='Leave the JSONL files as the only outputs instead of compacting each into .json')
+    parser.add_argument('--dead-letter-file', default='crawl_spec_dead_letters.jsonl',
+                        help='JSONL file collecting pages that failed permanently, for all targets '
+                             '(kept apart from the scraper.py --retry-dead-letters backlog)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Write request metrics here at the end of the run (.prom/.txt for Prometheus text, else JSON)')
+    parser.add_argument('--metrics-interval', type=float, default=0,
+                        help='Also rewrite --metrics-file every this many seconds during the run')
+    args = parser.parse_args()
+
+    try:
+        targets = (load_targets(args.spec) if args.spec else []) + args.target
+        check_targets(targets)
+    except ValueError as e:
+        parser.error(str(e))
+    if not targets:
+        parser.error("Give a --spec file or at least one --target")
+
+    metrics, metrics_dumper = start_metrics(args.metrics_file, args.metrics_interval)
+    scraper = StartupDetailsScraper(max_concurrent=args.concurrency, request_delay=args.request_delay,
+                                    dead_letter_file=args.dead_letter_file, metrics=metrics)
+    if args.base_url:
+        scraper.LISTINGS_API = f"{args.base_url.rstrip('/')}/api/pages/"
+
+    logger.info(f"Crawling {len(targets)} targets: {', '.join(target.name for target in targets)}")
+    try:
+        totals = asyncio.run(crawl_targets(scraper, targets, resume=args.resume))
+    finally:
+        finish_metrics(metrics, args.metrics_file, metrics_dumper)
+
+    for target in targets:
+        if not args.no_compact and totals[target.name] and target.output.endswith('.jsonl'):
+            compact_jsonl(target.output, os.path.splitext(target.output)[0] + '.json', ranks=scraper.listing_ranks)
+        logger.info(f"📊 {target.name} ({target.page_type}, {target.locale}): {totals[target.name]} records")
+    logger.info(f"✅ Crawl completed: {sum(totals.values())} records across {len(targets)} targets")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Sharded crawl of knowledge-share.eu startups across processes or machines
+A coordinator seeds a durable SQLite work queue with listing offsets and
+detail URLs; workers lease tasks from it, each with its own HTTP session and
+rate limit, and a final merge deduplicates their outputs by id
+
+Examples:
+    python distributed_crawl.py run --workers 4
+    python distributed_crawl.py seed --queue /shared/crawl_queue.db --shared-fs
+    python distributed_crawl.py worker --queue /shared/crawl_queue.db --shared-fs --output-dir /shared/crawl_parts
+    python distributed_crawl.py merge --queue /shared/crawl_queue.db --output-dir /shared/crawl_parts
+"""
+
+import argparse
+import asyncio
+import functools
+import glob
+import json
+import logging
+import os
+import socket
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+from crawl_queue import CrawlQueue, Task
+from jsonl_store import JsonArrayWriter, JsonlCheckpointWriter
+from scraper import StartupDetailsScraper
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+def detail_tasks(scraper: StartupDetailsScraper, page: Dict[str, Any], offset: int) -> List[tuple]:
+    """Queue entries for the startups on a listing page, ranked by listing position"""
+    return [('detail', f"detail:{info['id']}", info, offset + i)
+            for i, info in enumerate(scraper._page_startup_urls(page))]
+
+async def seed(queue: CrawlQueue, scraper: StartupDetailsScraper, page_size: int) -> int:
+    """Fetch the first listing page and queue its startups plus every remaining listing offset"""
+    async with scraper.create_session() as session:
+        first_page = await scraper.get_startup_page(session, page_size, 0)
+    total_count = first_page.get('meta', {}).get('totalCount', 0)
+
+    tasks = detail_tasks(scraper, first_page, 0)
+    tasks += [('listing', f"listing:{offset}", {'offset': offset, 'limit': page_size}, offset)
+              for offset in range(page_size, total_count, page_size)]
+    added = queue.add_many(tasks)
+    logger.info(f"Seeded {added} tasks for {total_count} listed startups")
+    return added
+
+class CrawlWorker:
+    """Lease tasks from the queue and run them with a private scraper
+
+    Records go to a per-worker JSONL file. Finished tasks are only marked
+    done in the queue after the records they produced have been fsynced, so
+    a crash can cause a task to be fetched twice but never lost; the merge
+    step drops the duplicates.
+
+    Queue calls can wait up to the busy timeout for another worker's write
+    lock, so they run on one dedicated thread instead of blocking the event
+    loop and every fetch in flight.
+    """
+
+    def __init__(self, queue: CrawlQueue, scraper: StartupDetailsScraper, output_dir: str,
+                 owner: Optional[str] = None, lease_seconds: float = 120.0, max_attempts: int = 5,
+                 retry_backoff: float = 5.0, poll_interval: float = 2.0):
+        self.queue = queue
+        self.scraper = scraper
+        self.owner = owner or f"{socket.gethostname()}-{os.getpid()}"
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.finished: List[int] = []  # Done, records not yet fsynced
+        self.flushed: List[int] = []  # Records fsynced, not yet marked done in the queue
+        self.fetched = 0
+        self._db_thread = ThreadPoolExecutor(max_workers=1, thread_name_prefix='crawl-queue')
+
+        os.makedirs(output_dir, exist_ok=True)
+        self.writer = JsonlCheckpointWriter(os.path.join(output_dir, f"{self.owner}.jsonl"), resume=True,
+                                            on_checkpoint=self.mark_flushed)
+
+    async def db(self, method: Callable, *args: Any, **kwargs: Any) -> Any:
+        """Run a CrawlQueue method on the queue thread"""
+        call = functools.partial(method, *args, **kwargs)
+        return await asyncio.get_running_loop().run_in_executor(self._db_thread, call)
+
+    def mark_flushed(self) -> None:
+        self.flushed += self.finished
+        self.finished = []
+
+    async def complete_flushed(self) -> None:
+        if self.flushed:
+            task_ids, self.flushed = self.flushed, []
+            await self.db(self.queue.complete, self.owner, task_ids)
+
+    async def run_task(self, session, task: Task) -> None:
+        try:
+            if task.kind == 'listing':
+                page = await self.scraper.get_startup_page(session, task.payload['limit'], task.payload['offset'])
+                await self.db(self.queue.add_many, detail_tasks(self.scraper, page, task.payload['offset']))
+            else:
+                self.writer.write(await self.scraper.get_startup_details(session, task.payload))
+                self.fetched += 1
+        except Exception as e:
+            permanent = self.scraper.is_permanent_failure(e) or task.attempts >= self.max_attempts
+            delay = min(self.retry_backoff * 2 ** (task.attempts - 1), 60)
+            if permanent:
+                logger.error(f"Giving up on {task.key} after {task.attempts} attempt(s): {e}")
+            else:
+                logger.warning(f"Retrying {task.key} in {delay:.0f}s (attempt {task.attempts}/{self.max_attempts}): {e}")
+            await self.db(self.queue.fail, self.owner, task, str(e), retry_delay=delay, permanent=permanent)
+            return
+        self.finished.append(task.id)
+
+    async def slot(self, session) -> None:
+        """One of max_concurrent loops, each claiming and running a task at a time"""
+        while True:
+            await self.complete_flushed()
+            tasks = await self.db(self.queue.claim, self.owner, limit=1, lease_seconds=self.lease_seconds)
+            if tasks:
+                await self.run_task(session, tasks[0])
+                continue
+            # Nothing claimable: flush what is finished, then stop once every task is settled
+            self.writer.checkpoint()
+            await self.complete_flushed()
+            if await self.db(self.queue.is_drained):
+                return
+            await asyncio.sleep(self.poll_interval)
+
+    async def heartbeat(self) -> None:
+        while True:
+            await asyncio.sleep(self.lease_seconds / 3)
+            await self.db(self.queue.renew, self.owner, self.lease_seconds)
+
+    async def run(self) -> int:
+        logger.info(f"Worker {self.owner} starting with {self.scraper.max_concurrent} slots")
+        heartbeat = asyncio.create_task(self.heartbeat())
+        try:
+            async with self.scraper.create_session() as session:
+                await asyncio.gather(*(self.slot(session) for _ in range(self.scraper.max_concurrent)))
+        finally:
+            heartbeat.cancel()
+            self.writer.close()
+            await self.complete_flushed()
+            await self.db(self.queue.release, self.owner)
+            self._db_thread.shutdown()
+        logger.info(f"Worker {self.owner} done: {self.fetched} startups fetched")
+        return self.fetched
+
+def merge(queue: CrawlQueue, output_dir: str, output: str, dead_letter_file: Optional[str] = None) -> int:
+    """Combine worker outputs into one JSON array, one record per id, in listing order
+
+    Only the byte offset of each id's last copy is kept in memory; records
+    are read back one at a time while writing.
+    """
+    if not queue.is_drained():
+        logger.warning("The queue still has pending or leased tasks; merging a partial crawl")
+    locations = {}
+    paths = sorted(glob.glob(os.path.join(output_dir, '*.jsonl')))
+    for file_index, path in enumerate(paths):
+        with open(path, 'rb') as f:
+            offset = 0
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break  # Torn final line from a crashed worker
+                if line.strip():
+                    locations[json.loads(line)['id']] = (file_index, offset)
+                offset += len(line)
+
+    ranks = queue.ranks('detail')
+    ordered = sorted(locations, key=lambda startup_id: (ranks.get(f"detail:{startup_id}", float('inf')), -startup_id))
+
+    handles = [open(path, 'rb') for path in paths]
+    try:
+        with JsonArrayWriter(output) as writer:
+            for startup_id in ordered:
+                file_index, offset = locations[startup_id]
+                handles[file_index].seek(offset)
+                writer.write(json.loads(handles[file_index].readline()))
+    finally:
+        for handle in handles:
+            handle.close()
+
+    failed = [(task, error) for task, error in queue.failed('detail') if task.payload['id'] not in locations]
+    if dead_letter_file and failed:
+        with open(dead_letter_file, 'w', encoding='utf-8') as f:
+            for task, error in failed:
+                entry = dict(task.payload, attempts=task.attempts, error=error, failed_at=time.time())
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        logger.warning(f"{len(failed)} startups failed permanently, listed in {dead_letter_file}")
+
+    # A failed listing page never queued its startups, so they are missing without a dead letter
+    failed_listings = queue.failed('listing')
+    if failed_listings:
+        offsets = ', '.join(str(task.payload['offset']) for task, _ in failed_listings)
+        logger.warning(f"{len(failed_listings)} listing pages failed permanently (offsets {offsets}); "
+                       f"their startups are missing from {output}. Re-run seed --retry-failed to fetch them")
+
+    logger.info(f"Merged {len(ordered)} startups from {len(paths)} worker files into {output}")
+    return len(ordered)
+
+def make_scraper(args: argparse.Namespace) -> StartupDetailsScraper:
+    scraper = StartupDetailsScraper(max_concurrent=args.concurrency, request_delay=args.request_delay)
+    if args.base_url:
+        scraper.LISTINGS_API = f"{args.base_url.rstrip('/')}/api/pages/"
+    return scraper
+
+def log_status(queue: CrawlQueue) -> None:
+    for kind, statuses in sorted(queue.counts().items()):
+        logger.info(f"📊 {kind}: " + ", ".join(f"{n} {status}" for status, n in sorted(statuses.items())))
+    for task, error in queue.failed('listing'):
+        logger.warning(f"Listing page at offset {task.payload['offset']} failed: {error}")
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queue', default='crawl_queue.db', help='SQLite queue file shared by all workers')
+    parser.add_argument('--shared-fs', action='store_true',
+                        help='The queue lives on a network filesystem used by several machines (disables WAL)')
+    parser.add_argument('--output-dir', default='crawl_parts', help='Directory of per-worker JSONL files')
+    parser.add_argument('--base-url', default=None, help='API origin to crawl instead of knowledge-share.eu')
+    parser.add_argument('--concurrency', type=int, default=10, help='Concurrent requests per worker')
+    parser.add_argument('--request-delay', type=float, default=0.3,
+                        help='Starting delay between requests per worker (0 disables rate limiting)')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    seed_parser = commands.add_parser('seed', help='Queue the listing offsets and first page of startups')
+    seed_parser.add_argument('--page-size', type=int, default=StartupDetailsScraper.PAGE_SIZE)
+    seed_parser.add_argument('--retry-failed', action='store_true', help='Also re-queue tasks that failed before')
+
+    worker_parser = commands.add_parser('worker', help='Process tasks until the queue is drained')
+    worker_parser.add_argument('--lease', type=float, default=120.0, help='Seconds a claimed task stays reserved')
+    worker_parser.add_argument('--max-attempts', type=int, default=5)
+
+    run_parser = commands.add_parser('run', help='Seed, run local worker processes, then merge')
+    run_parser.add_argument('--workers', type=int, default=4)
+    run_parser.add_argument('--page-size', type=int, default=StartupDetailsScraper.PAGE_SIZE)
+    run_parser.add_argument('--output', default='startup_details.json')
+    run_parser.add_argument('--dead-letter-file', default='crawl_dead_letters.jsonl')
+
+    merge_parser = commands.add_parser('merge', help='Deduplicate worker outputs into one JSON file')
+    merge_parser.add_argument('--output', default='startup_details.json')
+    merge_parser.add_argument('--dead-letter-file', default='crawl_dead_letters.jsonl')
+
+    commands.add_parser('status', help='Show task counts')
+
+    args = parser.parse_args()
+    queue = CrawlQueue(args.queue, shared_fs=args.shared_fs)
+
+    try:
+        if args.command in ('seed', 'run'):
+            if args.command == 'seed' and args.retry_failed:
+                logger.info(f"Re-queued {queue.retry_failed()} failed tasks")
+            if queue.is_empty():
+                asyncio.run(seed(queue, make_scraper(args), args.page_size))
+            else:
+                logger.info(f"{args.queue} is already seeded; continuing the existing crawl")
+
+        if args.command == 'worker':
+            worker = CrawlWorker(queue, make_scraper(args), args.output_dir, lease_seconds=args.lease,
+                                 max_attempts=args.max_attempts)
+            asyncio.run(worker.run())
+
+        if args.command == 'run':
+            worker_cmd = [sys.executable, os.path.abspath(__file__), '--queue', args.queue,
+                          '--output-dir', args.output_dir, '--concurrency', str(args.concurrency),
+                          '--request-delay', str(args.request_delay)]
+            if args.base_url:
+                worker_cmd += ['--base-url', args.base_url]
+            if args.shared_fs:
+                worker_cmd.append('--shared-fs')
+            workers = [subprocess.Popen(worker_cmd + ['worker']) for _ in range(args.workers)]
+            start = time.perf_counter()
+            crashed = sum(1 for proc in workers if proc.wait() != 0)
+            logger.info(f"{args.workers} workers finished in {time.perf_counter() - start:.1f}s")
+            # A partial merge would silently overwrite the output with a fraction of the startups
+            if crashed or not queue.is_drained():
+                if crashed:
+                    logger.error(f"{crashed} of {args.workers} workers exited with an error")
+                logger.error(f"Not merging: the crawl is unfinished; run it again to continue, "
+                             f"or merge explicitly for a partial {args.output}")
+                log_status(queue)
+                sys.exit(1)
+
+        if args.command in ('run', 'merge'):
+            merge(queue, args.output_dir, args.output, args.dead_letter_file)
+
+        log_status(queue)
+    finally:
+        queue.close()
+
+if __name__ == "__main__":
+    main()
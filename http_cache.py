@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+On-disk cache of raw API responses for the knowledge-share.eu scraper
+Supports conditional requests (ETag/Last-Modified) and offline replay
+"""
+
+import hashlib
+import logging
+import os
+import sqlite3
+import time
+from dataclasses import dataclass
+from typing import Dict, Optional
+from urllib.parse import urlencode
+
+logger = logging.getLogger(__name__)
+
+class CacheMiss(Exception):
+    """Raised in replay mode when a request has no cached response"""
+
+@dataclass
+class CachedResponse:
+    key: str
+    url: str
+    body_hash: str
+    etag: Optional[str]
+    last_modified: Optional[str]
+
+class ResponseCache:
+    """Content-addressed store of response bodies with an LRU size limit
+
+    Bodies live under <directory>/objects/ named by their SHA-256, so identical
+    responses are stored once. A SQLite index maps each request key (URL plus
+    sorted params) to its body and validators. When the stored bodies exceed
+    max_bytes, the least recently used entries are evicted.
+    """
+
+    def __init__(self, directory: str = '.http_cache', max_bytes: int = 512 * 1024 * 1024):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(directory, 'objects'), exist_ok=True)
+
+        self.conn = sqlite3.connect(os.path.join(directory, 'index.db'), isolation_level=None)
+        self.conn.executescript("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                body_hash TEXT NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                accessed_at REAL NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+            CREATE TABLE IF NOT EXISTS objects (
+                body_hash TEXT PRIMARY KEY,
+                size INTEGER NOT NULL
+            );
+        """)
+        self.total_bytes = self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM objects").fetchone()[0]
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    @staticmethod
+    def make_key(url: str, params: Optional[Dict] = None) -> str:
+        if params:
+            url = f"{url}?{urlencode(sorted(params.items()))}"
+        return hashlib.sha256(url.encode('utf-8')).hexdigest()
+
+    def _object_path(self, body_hash: str) -> str:
+        return os.path.join(self.directory, 'objects', body_hash[:2], body_hash)
+
+    def lookup(self, key: str) -> Optional[CachedResponse]:
+        row = self.conn.execute(
+            "SELECT key, url, body_hash, etag, last_modified FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        return CachedResponse(*row) if row else None
+
+    def conditional_headers(self, entry: CachedResponse) -> Dict[str, str]:
+        """Validators to send so the server can answer 304 Not Modified"""
+        headers = {}
+        if entry.etag:
+            headers['If-None-Match'] = entry.etag
+        if entry.last_modified:
+            headers['If-Modified-Since'] = entry.last_modified
+        return headers
+
+    def read_body(self, entry: CachedResponse) -> bytes:
+        self.conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), entry.key))
+        with open(self._object_path(entry.body_hash), 'rb') as f:
+            return f.read()
+
+    def store(self, key: str, url: str, body: bytes, etag: Optional[str] = None,
+              last_modified: Optional[str] = None) -> None:
+        body_hash = hashlib.sha256(body).hexdigest()
+        path = self._object_path(body_hash)
+
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{os.getpid()}.tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(body)
+            os.replace(tmp_path, path)
+
+        inserted = self.conn.execute(
+            "INSERT OR IGNORE INTO objects (body_hash, size) VALUES (?, ?)", (body_hash, len(body))
+        ).rowcount
+        self.total_bytes += len(body) if inserted else 0
+
+        self.conn.execute("""
+            INSERT OR REPLACE INTO responses (key, url, body_hash, etag, last_modified, accessed_at)
+            VALUES (?, ?, ?, ?, ?, ?)
+        """, (key, url, body_hash, etag, last_modified, time.time()))
+
+        if self.total_bytes > self.max_bytes:
+            self.evict()
+
+    def evict(self) -> None:
+        """Drop least recently used responses until the cache is below 90% of max_bytes"""
+        target = self.max_bytes * 0.9
+        evicted = 0
+        while self.total_bytes > target:
+            row = self.conn.execute("SELECT key FROM responses ORDER BY accessed_at LIMIT 1").fetchone()
+            if row is None:
+                break
+            self.conn.execute("DELETE FROM responses WHERE key = ?", row)
+            evicted += 1
+
+            # Bodies may be shared between keys, so only orphaned objects are removed
+            orphans = self.conn.execute("""
+                SELECT body_hash, size FROM objects
+                WHERE body_hash NOT IN (SELECT body_hash FROM responses)
+            """).fetchall()
+            for body_hash, size in orphans:
+                try:
+                    os.remove(self._object_path(body_hash))
+                except FileNotFoundError:
+                    pass
+                self.conn.execute("DELETE FROM objects WHERE body_hash = ?", (body_hash,))
+                self.total_bytes -= size
+
+        logger.info(f"Evicted {evicted} cached responses, cache now {self.total_bytes / 1024 / 1024:.1f} MB")
+
+    def close(self) -> None:
+        self.conn.close()
@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""
+JSON encoding and decoding for API responses and output files
+Uses orjson when it is installed, falling back to the standard library
+"""
+
+import json
+import logging
+from typing import Any, Optional, Union
+
+try:
+    import orjson
+except ImportError:  # Optional: every codec also works with the stdlib json module
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+BACKENDS = ('auto', 'orjson', 'stdlib')
+
+def to_json_default(value: Any) -> Any:
+    """Fallback for values JSON has no type for: records (see models.py) as dicts, anything else as str"""
+    to_dict = getattr(value, 'to_dict', None)
+    return to_dict() if to_dict is not None else str(value)
+
+class JsonCodec:
+    """Standard library codec, byte-compatible with the json.dumps calls it replaces
+
+    dumps matches json.dumps(value, ensure_ascii=False, default=str) and
+    dumps_pretty the same with indent=2, as used for the repo's output files.
+    """
+
+    name = 'stdlib'
+
+    def loads(self, data: Union[str, bytes]) -> Any:
+        return json.loads(data)
+
+    def dumps(self, value: Any) -> str:
+        return json.dumps(value, ensure_ascii=False, default=to_json_default)
+
+    def dumps_pretty(self, value: Any) -> str:
+        return json.dumps(value, indent=2, ensure_ascii=False, default=to_json_default)
+
+class OrjsonCodec(JsonCodec):
+    """orjson codec, several times faster than the stdlib on large records
+
+    Pretty output is the same as the stdlib's for strings, integers and
+    plain decimals, which covers every startup record. It differs for floats
+    in exponent form (1e16, not 1e+16) and NaN/Infinity (written as null);
+    compact output also has no space after ',' and ':'. Integers beyond 64
+    bits fall back to the stdlib.
+    """
+
+    name = 'orjson'
+
+    def __init__(self):
+        if orjson is None:
+            raise RuntimeError("The orjson JSON backend needs the 'orjson' package (pip install orjson)")
+        self.loads = orjson.loads
+        # Records (see models.py) go through to_json_default like they do with the stdlib
+        self.options = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS
+
+    def dumps(self, value: Any) -> str:
+        try:
+            return orjson.dumps(value, default=to_json_default, option=self.options).decode('utf-8')
+        except orjson.JSONEncodeError:
+            return super().dumps(value)
+
+    def dumps_pretty(self, value: Any) -> str:
+        try:
+            return orjson.dumps(value, default=to_json_default,
+                                option=self.options | orjson.OPT_INDENT_2).decode('utf-8')
+        except orjson.JSONEncodeError:
+            return super().dumps_pretty(value)
+
+def get_codec(backend: Optional[str] = 'auto') -> JsonCodec:
+    """Codec for a backend name: 'orjson', 'stdlib' (byte-compatible output) or 'auto' (orjson if installed)"""
+    if backend in (None, 'auto'):
+        backend = 'orjson' if orjson is not None else 'stdlib'
+    if backend == 'orjson':
+        return OrjsonCodec()
+    if backend == 'stdlib':
+        return JsonCodec()
+    raise ValueError(f"Unknown JSON backend {backend!r}, expected one of {', '.join(BACKENDS)}")
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Streaming record I/O for startup data
+Crash-safe JSON Lines writer with fsync'd checkpoints and resume support,
+plus incremental reading and writing of pretty-printed JSON arrays
+"""
+
+import json
+import logging
+import os
+import re
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+
+from json_codec import JsonCodec, get_codec
+
+logger = logging.getLogger(__name__)
+
+WHITESPACE = re.compile(r'\s*')
+
+def read_jsonl(path: str, codec: Optional[JsonCodec] = None) -> Iterator[Dict[str, Any]]:
+    """Yield records from a JSONL file, ignoring a torn final line"""
+    loads = (codec or get_codec()).loads
+    with open(path, 'rb') as f:
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # Partial write from a crash
+            if line.strip():
+                yield loads(line)
+
+def iter_json_array(path: str, chunk_size: int = 64 * 1024) -> Iterator[Any]:
+    """Yield the items of a top-level JSON array one at a time
+
+    Only the current item and one read chunk are held in memory, so the
+    file can be far larger than RAM.
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = '', 0, False
+
+    with open(path, 'r', encoding='utf-8') as f:
+        def read_more() -> None:
+            nonlocal buf, pos, eof
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf = buf[pos:] + chunk
+            pos = 0
+
+        def next_char() -> str:
+            nonlocal pos
+            while True:
+                pos = WHITESPACE.match(buf, pos).end()
+                if pos < len(buf):
+                    return buf[pos]
+                if eof:
+                    raise ValueError(f"Unexpected end of JSON array in {path}")
+                read_more()
+
+        if next_char() != '[':
+            raise ValueError(f"Expected a top-level JSON array in {path}")
+        pos += 1
+        if next_char() == ']':
+            return
+
+        while True:
+            next_char()
+            while True:
+                try:
+                    item, end = decoder.raw_decode(buf, pos)
+                    # The item is only complete once its separator is in view; a number
+                    # cut at the buffer edge (e.g. "1." of "1.5") would decode too early
+                    after = WHITESPACE.match(buf, end).end()
+                    if eof or (after < len(buf) and buf[after] in ',]'):
+                        break
+                except ValueError:
+                    if eof:
+                        raise
+                read_more()
+            pos = end
+            yield item
+
+            separator = next_char()
+            pos += 1
+            if separator == ']':
+                return
+            if separator != ',':
+                raise ValueError(f"Expected ',' or ']' in JSON array in {path}, got {separator!r}")
+
+class JsonArrayWriter:
+    """Write records one at a time as a pretty-printed JSON array
+
+    Output is byte-identical to json.dump(records, f, indent=2,
+    ensure_ascii=False) with the stdlib codec, and with orjson for records
+    without exponent-form floats (see json_codec.py). The file is written
+    under a temporary name and moved into place on close().
+    """
+
+    def __init__(self, path: str, codec: Optional[JsonCodec] = None):
+        self.path = path
+        self.codec = codec or get_codec()
+        self.count = 0
+        self._tmp_path = path + '.tmp'
+        self._file = open(self._tmp_path, 'w', encoding='utf-8')
+
+    def write(self, record: Any) -> None:
+        item = self.codec.dumps_pretty(record)
+        self._file.write('[\n  ' if self.count == 0 else ',\n  ')
+        self._file.write(item.replace('\n', '\n  '))
+        self.count += 1
+
+    def close(self) -> None:
+        self._file.write('\n]' if self.count else '[]')
+        self._file.close()
+        os.replace(self._tmp_path, self.path)
+
+    def __enter__(self) -> 'JsonArrayWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(self._tmp_path)
+
+def compact_jsonl(jsonl_path: str, json_path: str, codec: Optional[JsonCodec] = None,
+                  ranks: Optional[Dict[Any, int]] = None) -> int:
+    """Rewrite a JSONL file as a pretty-printed JSON array, streaming record by record
+
+    With ranks (id -> position, e.g. StartupDetailsScraper.listing_ranks)
+    records are written in rank order, ids without a rank last in file
+    order. Only byte offsets are held in memory for the sort.
+    """
+    codec = codec or get_codec()
+    if ranks is None:
+        with JsonArrayWriter(json_path, codec) as writer:
+            for record in read_jsonl(jsonl_path, codec):
+                writer.write(record)
+        logger.info(f"Compacted {writer.count} records from {jsonl_path} into {json_path}")
+        return writer.count
+
+    unranked = len(ranks)
+    positions = []
+    with open(jsonl_path, 'rb') as f:
+        offset = 0
+        for line in f:
+            if not line.endswith(b'\n'):
+                break  # Partial write from a crash
+            if line.strip():
+                positions.append((ranks.get(codec.loads(line).get('id'), unranked), len(positions), offset))
+            offset += len(line)
+    positions.sort()
+
+    with open(jsonl_path, 'rb') as f, JsonArrayWriter(json_path, codec) as writer:
+        for _, _, offset in positions:
+            f.seek(offset)
+            writer.write(codec.loads(f.readline()))
+    logger.info(f"Compacted {writer.count} records from {jsonl_path} into {json_path}")
+    return writer.count
+
+class JsonlCheckpointWriter:
+    """Append records to a JSONL file, fsyncing every checkpoint_every records
+
+    With resume=True an existing file is kept: a torn final line is truncated
+    and the ids already on disk are collected in existing_ids. Otherwise the
+    file is started afresh. on_checkpoint runs after each fsync, so anything
+    it persists (e.g. scrape state) never gets ahead of the records on disk.
+    """
+
+    def __init__(self, path: str, resume: bool = False, checkpoint_every: int = 25,
+                 on_checkpoint: Optional[Callable[[], None]] = None, codec: Optional[JsonCodec] = None):
+        self.path = path
+        self.codec = codec or get_codec()
+        self.checkpoint_every = checkpoint_every
+        self.on_checkpoint = on_checkpoint
+        self.existing_ids: Set[Any] = set()
+        self.count = 0
+        self._since_checkpoint = 0
+
+        if resume and os.path.exists(path):
+            self._truncate_torn_tail()
+            self.existing_ids = {record.get('id') for record in read_jsonl(path, self.codec)}
+            logger.info(f"Resuming {path} with {len(self.existing_ids)} records already on disk")
+            self._file = open(path, 'a', encoding='utf-8')
+        else:
+            self._file = open(path, 'w', encoding='utf-8')
+
+    def _truncate_torn_tail(self) -> None:
+        with open(self.path, 'rb+') as f:
+            f.seek(0, os.SEEK_END)
+            end = f.tell()
+            pos = end
+            # Walk back to the last newline; everything after it is a partial record
+            while pos > 0:
+                step = min(4096, pos)
+                f.seek(pos - step)
+                chunk = f.read(step)
+                newline = chunk.rfind(b'\n')
+                if newline != -1:
+                    pos = pos - step + newline + 1
+                    break
+                pos -= step
+            if pos != end:
+                logger.warning(f"Dropping {end - pos} bytes of partial record from {self.path}")
+                f.truncate(pos)
+
+    def write(self, record: Dict[str, Any]) -> None:
+        self._file.write(self.codec.dumps(record) + '\n')
+        self.count += 1
+        self._since_checkpoint += 1
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._since_checkpoint = 0
+        if self.on_checkpoint:
+            self.on_checkpoint()
+
+    def close(self) -> None:
+        if not self._file.closed:
+            self.checkpoint()
+            self._file.close()
@@ -0,0 +1,237 @@
+#!/usr/bin/env python3
+"""
+Lightweight run metrics for the scraper and cleaner
+Counters, gauges and bucketed histograms exported as JSON or Prometheus text
+"""
+
+import bisect
+import json
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+# Seconds; covers sub-millisecond waits up to the scraper's 30 s request timeout
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+
+class Metrics:
+    """No-op metrics sink, so instrumented code costs nothing when metrics are off"""
+
+    enabled = False
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        pass
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        pass
+
+    def set_max(self, name: str, value: float, **labels: Any) -> None:
+        pass
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        pass
+
+class Histogram:
+    """Fixed-bucket histogram with Prometheus semantics (upper-inclusive buckets)"""
+
+    def __init__(self, buckets: Sequence[float]):
+        self.buckets = tuple(buckets)
+        self.counts = [0] * (len(self.buckets) + 1)  # Last slot is +Inf
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Estimate a quantile by linear interpolation inside its bucket"""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if n and seen + n >= rank:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                if i == len(self.buckets):
+                    return lower  # Beyond the last bucket only its lower bound is known
+                return lower + (self.buckets[i] - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def to_dict(self) -> Dict[str, Any]:
+        cumulative, buckets = 0, {}
+        for bound, n in zip([*self.buckets, '+Inf'], self.counts):
+            cumulative += n
+            buckets[str(bound)] = cumulative
+        return {
+            'count': self.count,
+            'sum': self.sum,
+            'p50': self.quantile(0.50),
+            'p95': self.quantile(0.95),
+            'p99': self.quantile(0.99),
+            'buckets': buckets,
+        }
+
+class MetricsRegistry(Metrics):
+    """Thread-safe in-memory metrics, keyed by name and label set
+
+    Collectors registered with add_collector run before every export, for
+    values that are cheaper to read at dump time than to update on each
+    event (e.g. per-stage CPU totals kept by DataCleaner).
+    """
+
+    enabled = True
+
+    def __init__(self):
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.gauges: Dict[str, Dict[LabelKey, float]] = {}
+        self.histograms: Dict[str, Dict[LabelKey, Histogram]] = {}
+        self.bucket_layouts: Dict[str, Sequence[float]] = {}
+        self.collectors: List[Callable[['MetricsRegistry'], None]] = []
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _key(labels: Dict[str, Any]) -> LabelKey:
+        return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+    def set_buckets(self, name: str, buckets: Sequence[float]) -> None:
+        """Use these bucket bounds for histogram name (default: LATENCY_BUCKETS)"""
+        self.bucket_layouts[name] = buckets
+
+    def add_collector(self, collector: Callable[['MetricsRegistry'], None]) -> None:
+        self.collectors.append(collector)
+
+    def inc(self, name: str, value: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def set(self, name: str, value: float, **labels: Any) -> None:
+        with self._lock:
+            self.gauges.setdefault(name, {})[self._key(labels)] = value
+
+    def set_max(self, name: str, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self.gauges.setdefault(name, {})
+            if value > series.get(key, float('-inf')):
+                series[key] = value
+
+    def observe(self, name: str, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            histogram = series.get(key)
+            if histogram is None:
+                histogram = series[key] = Histogram(self.bucket_layouts.get(name, LATENCY_BUCKETS))
+            histogram.observe(value)
+
+    def collect(self) -> None:
+        for collector in self.collectors:
+            collector(self)
+
+    def to_dict(self) -> Dict[str, Any]:
+        self.collect()
+        with self._lock:
+            return {
+                'counters': {name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                             for name, series in sorted(self.counters.items())},
+                'gauges': {name: [{'labels': dict(key), 'value': value} for key, value in series.items()]
+                           for name, series in sorted(self.gauges.items())},
+                'histograms': {name: [{'labels': dict(key), **histogram.to_dict()} for key, histogram in series.items()]
+                               for name, series in sorted(self.histograms.items())},
+            }
+
+    @staticmethod
+    def _labels_text(key: LabelKey, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = [*key, extra] if extra else list(key)
+        if not pairs:
+            return ''
+        escaped = (k + '="' + v.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+                   for k, v in pairs)
+        return '{' + ','.join(escaped) + '}'
+
+    def to_prometheus(self) -> str:
+        """Render all metrics in the Prometheus text exposition format"""
+        self.collect()
+        lines = []
+        with self._lock:
+            for kind, store in (('counter', self.counters), ('gauge', self.gauges)):
+                for name, series in sorted(store.items()):
+                    lines.append(f"# TYPE {name} {kind}")
+                    for key, value in series.items():
+                        lines.append(f"{name}{self._labels_text(key)} {float(value)!r}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE {name} histogram")
+                for key, histogram in series.items():
+                    cumulative = 0
+                    for bound, n in zip([*histogram.buckets, '+Inf'], histogram.counts):
+                        cumulative += n
+                        lines.append(f"{name}_bucket{self._labels_text(key, ('le', str(bound)))} {cumulative}")
+                    lines.append(f"{name}_sum{self._labels_text(key)} {histogram.sum!r}")
+                    lines.append(f"{name}_count{self._labels_text(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write(self, path: str) -> None:
+        """Write a snapshot to path: Prometheus text for .prom/.txt, JSON otherwise"""
+        if path.endswith(('.prom', '.txt')):
+            content = self.to_prometheus()
+        else:
+            content = json.dumps(self.to_dict(), indent=2)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(content)
+        os.replace(tmp_path, path)
+
+class MetricsDumper:
+    """Background thread rewriting the metrics file every interval seconds"""
+
+    def __init__(self, registry: MetricsRegistry, path: str, interval: float):
+        self.registry = registry
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name='metrics-dumper', daemon=True)
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.registry.write(self.path)
+            except Exception as e:
+                logger.warning(f"Could not write metrics to {self.path}: {e}")
+
+    def start(self) -> 'MetricsDumper':
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        """Stop dumping and write one final snapshot"""
+        self._stop.set()
+        self._thread.join()
+        self.registry.write(self.path)
+
+def start_metrics(path: Optional[str], interval: float = 0.0) -> Tuple[Metrics, Optional[MetricsDumper]]:
+    """Metrics sink for a run: a live registry if path is set (dumped every interval seconds, if > 0)"""
+    if not path:
+        return Metrics(), None
+    registry = MetricsRegistry()
+    dumper = MetricsDumper(registry, path, interval).start() if interval > 0 else None
+    return registry, dumper
+
+def finish_metrics(metrics: Metrics, path: Optional[str], dumper: Optional[MetricsDumper]) -> None:
+    """Write the final metrics snapshot for a run started with start_metrics"""
+    if not path:
+        return
+    if dumper:
+        dumper.stop()
+    else:
+        metrics.write(path)
+    logger.info(f"Metrics written to {path}")
@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Typed, slotted records for cleaned startups
+Covers DataCleaner's essential_fields schema; converts to and from the plain dicts used elsewhere
+
+The scraper, cleaner and startup_db still pass plain dicts, which they read
+and write one record at a time; these records are for code that keeps a
+whole cleaned file in memory, through load_startups() or iter_startups().
+"""
+
+import argparse
+import logging
+import time
+import tracemalloc
+from dataclasses import dataclass, fields
+from typing import Any, ClassVar, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from json_codec import BACKENDS, JsonCodec, get_codec
+from jsonl_store import JsonArrayWriter
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+class Struct:
+    """Base of the nested value types: fixed keys, compared and hashed by value"""
+
+    __slots__ = ()
+    KEYS: ClassVar[Tuple[str, ...]] = ()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {key: getattr(self, key) for key in self.KEYS}
+
+    @classmethod
+    def coerce(cls, value: Any, cache: Dict[Any, Any]) -> Any:
+        """Typed (and shared) instance for a dict with exactly this type's keys, in order
+
+        Anything else is returned unchanged, so unexpected shapes still
+        round-trip exactly.
+        """
+        if not isinstance(value, dict) or tuple(value) != cls.KEYS:
+            return value
+        key = (cls, *value.values())
+        try:
+            instance = cache.get(key)
+        except TypeError:  # Unhashable field value, e.g. a nested list
+            return cls(*value.values())
+        if instance is None:
+            instance = cache[key] = cls(*value.values())
+        return instance
+
+@dataclass(frozen=True, slots=True)
+class Choice(Struct):
+    """A select option, e.g. fundingStage, trl, status and lookingFor entries"""
+    label: str
+    value: str
+
+@dataclass(frozen=True, slots=True)
+class Category(Struct):
+    id: int
+    group: int
+    name: str
+
+@dataclass(frozen=True, slots=True)
+class Tag(Struct):
+    id: int
+    name: str
+
+@dataclass(frozen=True, slots=True)
+class Owner(Struct):
+    id: int
+    name: str
+    organizationType: str
+
+for struct in (Choice, Category, Tag, Owner):
+    struct.KEYS = tuple(f.name for f in fields(struct))
+
+@dataclass(slots=True, eq=False)
+class Startup:
+    """One cleaned startup
+
+    Attributes are named after the API's JSON keys and are None when the
+    record does not have the field. keys holds the record's keys in their
+    original order (one shared tuple per layout), so to_dict() gives back
+    exactly the dict the record was built from; keys outside the schema are
+    kept in extra. Nested options, categories, tags and owners become shared
+    immutable instances, so a large load keeps one copy of each.
+    """
+    id: int
+    abstract: Optional[str] = None
+    businessTraction: Optional[str] = None
+    categories: Optional[Tuple[Category, ...]] = None
+    certifications: Any = None
+    competitiveAdvantages: Optional[str] = None
+    competitiveScenario: Optional[str] = None
+    description: Optional[str] = None
+    employeesNumber: Any = None
+    enablingTechnologies: Optional[str] = None
+    establishmentTimeframe: Any = None
+    fiscalId: Optional[str] = None
+    fundingStage: Optional[Choice] = None
+    fundingStageDescription: Optional[str] = None
+    initiative: Any = None
+    isAccredited: Optional[bool] = None
+    isInnovative: Optional[bool] = None
+    legalForm: Any = None
+    linkedinPage: Optional[str] = None
+    locality: Any = None
+    lookingFor: Optional[Tuple[Choice, ...]] = None
+    mainApplications: Optional[str] = None
+    owners: Optional[Tuple[Owner, ...]] = None
+    partnerTypes: Optional[Tuple[Choice, ...]] = None
+    payoff: Optional[str] = None
+    publicationLinks: Any = None
+    resolutionStatus: Any = None
+    revenue: Any = None
+    revenueModel: Optional[str] = None
+    scientificPublications: Any = None
+    status: Optional[Choice] = None
+    tags: Optional[Tuple[Tag, ...]] = None
+    targetCustomers: Optional[str] = None
+    team: Any = None
+    title: Optional[str] = None
+    trl: Optional[Choice] = None
+    website: Optional[str] = None
+    yearEstablished: Any = None
+    keys: Tuple[str, ...] = ()
+    extra: Optional[Dict[str, Any]] = None
+
+    SCHEMA: ClassVar[frozenset] = frozenset()
+    # Fields holding one option, and list fields whose items get a nested type
+    SINGLE_TYPES: ClassVar[Dict[str, type]] = {
+        'fundingStage': Choice, 'trl': Choice, 'status': Choice, 'initiative': Choice,
+    }
+    LIST_TYPES: ClassVar[Dict[str, type]] = {
+        'categories': Category, 'tags': Tag, 'owners': Owner, 'lookingFor': Choice, 'partnerTypes': Choice,
+    }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], cache: Optional[Dict[Any, Any]] = None) -> 'Startup':
+        """Build a record from a cleaned dict; pass the same cache to share nested values across records"""
+        if cache is None:
+            cache = {}
+        values, extra = {}, None
+        for key, value in data.items():
+            if key not in cls.SCHEMA:
+                if extra is None:
+                    extra = {}
+                extra[key] = value
+            elif key in cls.LIST_TYPES and isinstance(value, list):
+                struct = cls.LIST_TYPES[key]
+                values[key] = tuple(struct.coerce(item, cache) for item in value)
+            elif key in cls.SINGLE_TYPES:
+                values[key] = cls.SINGLE_TYPES[key].coerce(value, cache)
+            else:
+                values[key] = value
+        keys = tuple(data)
+        values['keys'] = cache.setdefault(keys, keys)
+        values['extra'] = extra
+        return cls(**values)
+
+    def to_dict(self) -> Dict[str, Any]:
+        record = {}
+        for key in self.keys:
+            if key in self.SCHEMA:
+                value = getattr(self, key)
+                if isinstance(value, Struct):
+                    value = value.to_dict()
+                elif isinstance(value, tuple) and key in self.LIST_TYPES:
+                    value = [item.to_dict() if isinstance(item, Struct) else item for item in value]
+                record[key] = value
+            else:
+                record[key] = self.extra[key]
+        return record
+
+Startup.SCHEMA = frozenset(f.name for f in fields(Startup)) - {'keys', 'extra'}
+
+def iter_startups(records: Iterable[Dict[str, Any]]) -> Iterator[Startup]:
+    """Typed records for an iterable of cleaned dicts, sharing nested values between them"""
+    cache: Dict[Any, Any] = {}
+    for record in records:
+        yield Startup.from_dict(record, cache)
+
+def load_startups(path: str, codec: Optional[JsonCodec] = None) -> List[Startup]:
+    """Load a cleaned JSON array file (e.g. startup_details_clean.json) as typed records"""
+    codec = codec or get_codec()
+    with open(path, 'rb') as f:
+        return list(iter_startups(codec.loads(f.read())))
+
+def save_startups(startups: Iterable[Startup], path: str, codec: Optional[JsonCodec] = None) -> int:
+    """Write typed records as a pretty-printed JSON array, in the same format as the cleaner's output"""
+    with JsonArrayWriter(path, codec=codec) as writer:
+        for startup in startups:
+            writer.write(startup.to_dict())
+    return writer.count
+
+def main():
+    """Load a cleaned file as typed records and write it back, reporting memory and timings"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('input', nargs='?', default='startup_details_clean.json', help='Cleaned JSON array file')
+    parser.add_argument('--output', default=None, help='Write the records back here (to check the round trip)')
+    parser.add_argument('--json-backend', choices=BACKENDS, default='auto',
+                        help="JSON library to use; 'stdlib' gives output byte-identical to earlier versions")
+    args = parser.parse_args()
+
+    codec = get_codec(args.json_backend)
+    tracemalloc.start()
+    start = time.perf_counter()
+    startups = load_startups(args.input, codec)
+    elapsed = time.perf_counter() - start
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    logger.info(f"✅ Loaded {len(startups)} startups with {codec.name} in {elapsed:.3f}s, "
+                f"{current / max(len(startups), 1) / 1024:.1f} KB per record")
+
+    if args.output:
+        start = time.perf_counter()
+        count = save_startups(startups, args.output, codec)
+        logger.info(f"✅ Wrote {count} startups to {args.output} in {time.perf_counter() - start:.3f}s")
+
+if __name__ == "__main__":
+    main()
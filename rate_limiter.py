@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Rate limiters for the knowledge-share.eu scrapers
+Adaptive token bucket (AIMD) that backs off on 429/5xx and honors Retry-After
+"""
+
+import asyncio
+import logging
+import time
+from email.utils import parsedate_to_datetime
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (delta seconds or HTTP date) into seconds"""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, retry_at.timestamp() - time.time())
+
+class RateLimiter:
+    """Limiter interface; the base class lets every request through"""
+
+    async def acquire(self) -> None:
+        """Wait until a request may be sent"""
+
+    def record_success(self) -> None:
+        """Called after a successful response"""
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        """Called after a 429/5xx response"""
+
+class AdaptiveRateLimiter(RateLimiter):
+    """Token bucket whose rate is tuned by additive increase, multiplicative decrease
+
+    Every success raises the rate by increase_step requests/second up to
+    max_rate. A throttling response cuts it by decrease_factor (at most once
+    per cooldown, so a burst of 429s from the same window counts once) and,
+    if the server sent Retry-After, holds all requests until it has passed.
+    """
+
+    def __init__(self, initial_rate: float = 5.0, min_rate: float = 0.5, max_rate: float = 50.0,
+                 increase_step: float = 0.5, decrease_factor: float = 0.5,
+                 burst: float = 5.0, cooldown: float = 1.0):
+        self.rate = initial_rate
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase_step = increase_step
+        self.decrease_factor = decrease_factor
+        self.burst = burst
+        self.cooldown = cooldown
+
+        self.tokens = burst
+        self.last_refill = time.monotonic()
+        self.blocked_until = 0.0
+        self.last_decrease = 0.0
+        self._lock = asyncio.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.burst, self.tokens + (now - self.last_refill) * self.rate)
+        self.last_refill = now
+
+    async def acquire(self) -> None:
+        # The lock makes waiters take tokens in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self.blocked_until:
+                    await asyncio.sleep(self.blocked_until - now)
+                    continue
+
+                self._refill(now)
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                await asyncio.sleep((1 - self.tokens) / self.rate)
+
+    def record_success(self) -> None:
+        self.rate = min(self.max_rate, self.rate + self.increase_step)
+
+    def record_throttle(self, retry_after: Optional[float] = None) -> None:
+        now = time.monotonic()
+        self._refill(now)
+
+        if now - self.last_decrease >= self.cooldown:
+            self.rate = max(self.min_rate, self.rate * self.decrease_factor)
+            self.last_decrease = now
+            logger.warning(f"Throttled, reducing request rate to {self.rate:.2f}/s")
+
+        if retry_after:
+            self.blocked_until = max(self.blocked_until, now + retry_after)
+            self.tokens = 0
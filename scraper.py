@@ -5,25 +5,125 @@ Scrapes all startup details without images or HTML content
 """
 
 import aiohttp
+import argparse
 import asyncio
+import itertools
 import json
 import logging
+import os
+import shutil
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor
 from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple
+
+from clean_data import DataSummary, clean_startup_record
+from http_cache import CacheMiss, ResponseCache
+from json_codec import BACKENDS, JsonCodec, get_codec
+from jsonl_store import JsonlCheckpointWriter, compact_jsonl, read_jsonl
+from metrics import SIZE_BUCKETS, Metrics, finish_metrics, start_metrics
+from snapshot_store import write_snapshot
+from rate_limiter import AdaptiveRateLimiter, RateLimiter, parse_retry_after
+from state_store import ScrapeStateStore, content_hash
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
 
+class DetailQueue:
+    """Priority work queue for detail fetches
+    
+    Fresh URLs are served before retries: each entry is prioritised by its
+    attempt count, and a failed item is put back only after its backoff delay
+    has elapsed. join() returns once the listing has finished (None sentinel)
+    and every item has either succeeded or been dead-lettered.
+    """
+    
+    def __init__(self):
+        self._queue = asyncio.PriorityQueue()
+        self._counter = itertools.count()
+        self._pending = 0  # queued, in flight or waiting out a backoff
+        self._listing_done = False
+        self._drained = asyncio.Event()
+    
+    def put_nowait(self, startup_info: Optional[Dict[str, Any]], attempt: int = 0) -> None:
+        if startup_info is None:
+            self._listing_done = True
+            self._check_drained()
+            return
+        self._pending += 1
+        self._queue.put_nowait((attempt, next(self._counter), startup_info))
+    
+    def requeue_later(self, startup_info: Dict[str, Any], attempt: int, delay: float) -> None:
+        """Put a failed item back after delay seconds, behind fresh work"""
+        entry = (attempt, next(self._counter), startup_info)
+        asyncio.get_running_loop().call_later(delay, self._queue.put_nowait, entry)
+    
+    async def get(self) -> Tuple[int, Dict[str, Any]]:
+        attempt, _, startup_info = await self._queue.get()
+        return attempt, startup_info
+    
+    def task_done(self) -> None:
+        self._pending -= 1
+        self._check_drained()
+    
+    def _check_drained(self) -> None:
+        if self._listing_done and self._pending == 0:
+            self._drained.set()
+    
+    async def join(self) -> None:
+        await self._drained.wait()
+
+def count_fetch_retry(retry_state) -> None:
+    """tenacity before_sleep hook: count a fetch_json retry on the scraper's metrics"""
+    scraper = retry_state.args[0]
+    scraper.metrics.inc('scraper_fetch_retries_total')
+
 class StartupDetailsScraper:
     """Async scraper for startup details with retry mechanisms"""
     
     BASE_URL = "https://www.knowledge-share.eu"
     LISTINGS_API = f"{BASE_URL}/api/pages/"
+    PAGE_SIZE = 20
+    CONNECTOR_LIMIT = 100
+    CONNECTOR_LIMIT_PER_HOST = 30
     
-    def __init__(self, max_concurrent: int = 10, request_delay: float = 0.5):
+    def __init__(self, max_concurrent: int = 10, request_delay: float = 0.5,
+                 max_attempts: int = 3, retry_backoff: float = 5.0,
+                 dead_letter_file: str = 'dead_letters.jsonl',
+                 rate_limiter: Optional[RateLimiter] = None,
+                 state_store: Optional[ScrapeStateStore] = None,
+                 cache: Optional[ResponseCache] = None, replay: bool = False,
+                 metrics: Optional[Metrics] = None, codec: Optional[JsonCodec] = None):
+        if replay and cache is None:
+            raise ValueError("Replay mode needs a response cache")
         self.max_concurrent = max_concurrent
         self.request_delay = request_delay
+        self.state_store = state_store
+        self.unchanged_count = 0
+        self.scraped_count = 0
+        self.skip_ids = set()  # Already scraped, e.g. when resuming a JSONL run
+        self.listing_ranks: Dict[Any, int] = {}  # id -> listing position, for writing output in listing order
+        self.clean_summary: Optional[DataSummary] = None  # Updated per cleaned record with --clean
+        self.cache = cache
+        self.replay = replay  # Serve every request from the cache, never touching the network
+        self.max_attempts = max_attempts  # Pool-level attempts, each with its own tenacity retries
+        self.retry_backoff = retry_backoff
+        self.dead_letter_file = dead_letter_file
         self.semaphore = asyncio.Semaphore(max_concurrent)
+        self.in_flight = 0
+        self.codec = codec or get_codec()  # Decodes responses and encodes output files
+        
+        # A no-op sink unless a MetricsRegistry is passed in
+        self.metrics = metrics or Metrics()
+        if self.metrics.enabled:
+            self.metrics.set_buckets('scraper_response_bytes', SIZE_BUCKETS)
+            self.metrics.set('scraper_max_concurrent', max_concurrent)
+            self.metrics.add_collector(self.collect_metrics)
+        
+        # request_delay only seeds the starting rate; the limiter adapts from there
+        if rate_limiter is None:
+            rate_limiter = AdaptiveRateLimiter(initial_rate=1 / request_delay) if request_delay > 0 else RateLimiter()
+        self.rate_limiter = rate_limiter
         
         # Headers from working configuration
         self.headers = {
@@ -47,29 +147,120 @@ class StartupDetailsScraper:
         stop=stop_after_attempt(3),
         wait=wait_exponential(multiplier=1, min=2, max=10),
         retry=retry_if_exception_type((aiohttp.ClientError, asyncio.TimeoutError)),
+        before_sleep=count_fetch_retry,
         reraise=True
     )
     async def fetch_json(self, session: aiohttp.ClientSession, url: str, params: Dict = None) -> Dict[str, Any]:
         """Fetch JSON data with retry mechanism"""
+        cache_key = self.cache.make_key(url, params) if self.cache else None
+        cached = self.cache.lookup(cache_key) if self.cache else None
+        
+        if self.replay:
+            if cached is None:
+                raise CacheMiss(f"No cached response for {url}")
+            self.cache.hits += 1
+            return self.codec.loads(self.cache.read_body(cached))
+        
+        metrics = self.metrics
+        endpoint = 'listing' if url == self.LISTINGS_API else 'detail'
+        
+        # Wait for the rate limiter before taking a connection slot, never while holding one
+        wait_start = time.perf_counter()
+        await self.rate_limiter.acquire()
+        limiter_done = time.perf_counter()
+        if self.semaphore.locked():
+            metrics.inc('scraper_semaphore_saturated_total')
+        
         async with self.semaphore:
+            request_start = time.perf_counter()
+            metrics.observe('scraper_rate_limiter_wait_seconds', limiter_done - wait_start)
+            metrics.observe('scraper_semaphore_wait_seconds', request_start - limiter_done)
+            self.in_flight += 1
+            metrics.set_max('scraper_in_flight_peak', self.in_flight)
             try:
                 timeout = aiohttp.ClientTimeout(total=30)
-                async with session.get(url, params=params, headers=self.headers, timeout=timeout) as response:
-                    if response.status == 429:  # Rate limited
-                        await asyncio.sleep(5)
-                        raise aiohttp.ClientError("Rate limited")
-                    
-                    response.raise_for_status()
-                    data = await response.json()
-                    await asyncio.sleep(self.request_delay)  # Rate limiting
-                    return data
+                headers = self.headers
+                if cached:
+                    headers = {**self.headers, **self.cache.conditional_headers(cached)}
+                
+                async with session.get(url, params=params, headers=headers, timeout=timeout) as response:
+                    metrics.inc('scraper_responses_total', endpoint=endpoint, status=response.status)
+                    if response.status == 429:
+                        metrics.inc('scraper_throttled_total', endpoint=endpoint)
+                    if response.status == 304 and cached:
+                        # Not modified: no body was sent, reuse the stored one
+                        self.cache.not_modified += 1
+                        body = self.cache.read_body(cached)
+                    else:
+                        if response.status == 429 or response.status >= 500:
+                            self.rate_limiter.record_throttle(parse_retry_after(response.headers.get('Retry-After')))
+                        
+                        response.raise_for_status()
+                        body = await response.read()
+                        metrics.inc('scraper_response_bytes_total', len(body), endpoint=endpoint)
+                        metrics.observe('scraper_response_bytes', len(body), endpoint=endpoint)
+                        if self.cache:
+                            self.cache.misses += 1
+                            self.cache.store(cache_key, url, body, response.headers.get('ETag'),
+                                             response.headers.get('Last-Modified'))
                     
             except Exception as e:
+                metrics.inc('scraper_fetch_errors_total', endpoint=endpoint, error=type(e).__name__)
                 logger.error(f"Error fetching {url}: {e}")
                 raise
+            finally:
+                self.in_flight -= 1
+                metrics.observe('scraper_request_seconds', time.perf_counter() - request_start, endpoint=endpoint)
+        
+        self.rate_limiter.record_success()
+        return self.codec.loads(body)
+    
+    def collect_metrics(self, metrics: Metrics) -> None:
+        """Gauges read at export time from state the scraper already keeps"""
+        metrics.set('scraper_in_flight', self.in_flight)
+        if isinstance(self.rate_limiter, AdaptiveRateLimiter):
+            metrics.set('scraper_rate_limit_per_second', self.rate_limiter.rate)
+        if self.cache:
+            metrics.set('scraper_cache_hits', self.cache.hits)
+            metrics.set('scraper_cache_misses', self.cache.misses)
+            metrics.set('scraper_cache_not_modified', self.cache.not_modified)
     
-    async def get_startup_page(self, session: aiohttp.ClientSession, limit: int, offset: int) -> Dict[str, Any]:
-        """Get a single page of startups"""
+    def create_session(self) -> aiohttp.ClientSession:
+        """HTTP session with this scraper's connection limits and tracing hooks"""
+        connector = aiohttp.TCPConnector(limit=self.CONNECTOR_LIMIT, limit_per_host=self.CONNECTOR_LIMIT_PER_HOST)
+        timeout = aiohttp.ClientTimeout(total=60)
+        return aiohttp.ClientSession(connector=connector, timeout=timeout, trace_configs=self.trace_configs())
+    
+    def trace_configs(self) -> List[aiohttp.TraceConfig]:
+        """aiohttp tracing hooks feeding connection-pool metrics (none when metrics are off)"""
+        if not self.metrics.enabled:
+            return []
+        metrics = self.metrics
+        
+        async def on_queued_start(session, context, params) -> None:
+            context.queued_at = time.perf_counter()
+        
+        async def on_queued_end(session, context, params) -> None:
+            # Only requests that found every pooled connection busy are queued
+            metrics.inc('scraper_connection_pool_waits_total')
+            metrics.observe('scraper_connection_pool_wait_seconds', time.perf_counter() - context.queued_at)
+        
+        async def on_create_end(session, context, params) -> None:
+            metrics.inc('scraper_connections_created_total')
+        
+        async def on_reuse(session, context, params) -> None:
+            metrics.inc('scraper_connections_reused_total')
+        
+        trace_config = aiohttp.TraceConfig()
+        trace_config.on_connection_queued_start.append(on_queued_start)
+        trace_config.on_connection_queued_end.append(on_queued_end)
+        trace_config.on_connection_create_end.append(on_create_end)
+        trace_config.on_connection_reuseconn.append(on_reuse)
+        return [trace_config]
+    
+    async def get_startup_page(self, session: aiohttp.ClientSession, limit: int, offset: int,
+                               listing: Optional[Dict[str, str]] = None) -> Dict[str, Any]:
+        """Get a single page of startups, or of another page type/locale given by listing params"""
         params = {
             'limit': str(limit),
             'offset': str(offset),
@@ -79,57 +270,126 @@ class StartupDetailsScraper:
             'locale': 'en',
             'type': 'startups.StartUpPage'
         }
+        if listing:
+            params.update(listing)
         
         return await self.fetch_json(session, self.LISTINGS_API, params)
     
-    async def get_all_startup_urls(self, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
-        """Get all startup detail URLs from listings API"""
-        detail_urls = []
-        offset = 0
-        limit = 20  # API maximum
+    def _page_startup_urls(self, data: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """Extract detail URL entries from a listings page
         
-        logger.info("Getting startup URLs...")
+        published_at and listing_hash identify the listed revision, so an
+        incremental run can tell whether the detail page needs refetching.
+        """
+        startup_urls = []
+        for item in data.get('items', []):
+            meta = item.get('meta', {})
+            startup_urls.append({
+                'id': item['id'],
+                'title': item['title'],
+                'detail_url': meta['detailUrl'],
+                'published_at': meta.get('lastPublishedAt') or meta.get('firstPublishedAt'),
+                'listing_hash': content_hash({k: v for k, v in item.items() if k not in ('meta', 'previewImage')})
+            })
+        return startup_urls
+    
+    async def enqueue_startup_urls(self, session: aiohttp.ClientSession, queue: asyncio.Queue, limit: int = 20,
+                                   incremental: bool = False, stop_after_unchanged_pages: int = 2,
+                                   listing: Optional[Dict[str, str]] = None) -> int:
+        """Push startup detail URLs onto the queue as listing pages arrive
         
-        while True:
+        The first page reports meta.totalCount, after which all remaining
+        offsets are fetched concurrently (bounded by the semaphore). A None
+        sentinel is queued once the listing is exhausted.
+        
+        In incremental mode only new or changed startups are queued, and the
+        listing is walked newest-first, stop_after_unchanged_pages pages at a
+        time, until a run of that many pages holds nothing to fetch. Edits to
+        older startups that do not move them up the listing need a full run.
+        listing overrides the page type, locale or fields of the listing
+        query (see get_startup_page). Returns the number of URLs queued.
+        
+        Details finish in any order, so the listing position of every id
+        seen (skipped ones included) is kept in listing_ranks for sorting
+        the output afterwards.
+        """
+        seen_ids = set()
+        queued = 0
+        
+        def enqueue_page(data: Dict[str, Any], offset: int) -> int:
+            nonlocal queued
+            found = 0
+            for index, startup_info in enumerate(self._page_startup_urls(data)):
+                # Offsets can shift if startups are published mid-crawl
+                if startup_info['id'] in seen_ids:
+                    continue
+                seen_ids.add(startup_info['id'])
+                self.listing_ranks[startup_info['id']] = offset + index
+                if startup_info['id'] in self.skip_ids:
+                    continue
+                if incremental and not self.state_store.is_changed(startup_info):
+                    continue
+                queue.put_nowait(startup_info)
+                found += 1
+            queued += found
+            return found
+        
+        async def fetch_page(offset: int) -> Optional[int]:
             try:
-                data = await self.get_startup_page(session, limit, offset)
-                items = data.get('items', [])
-                
-                if not items:
-                    break
-                
-                for item in items:
-                    detail_urls.append({
-                        'id': item['id'],
-                        'title': item['title'],
-                        'detail_url': item['meta']['detailUrl']
-                    })
-                
-                logger.info(f"Found {len(items)} URLs (total: {len(detail_urls)})")
-                
-                total_count = data.get('meta', {}).get('totalCount', 0)
-                if len(detail_urls) >= total_count:
-                    break
-                
-                offset += limit
-                
+                data = await self.get_startup_page(session, limit, offset, listing)
             except Exception as e:
                 logger.error(f"Error getting URLs at offset {offset}: {e}")
-                break
+                return None
+            found = enqueue_page(data, offset)
+            logger.info(f"Found {found} URLs at offset {offset} (total: {len(seen_ids)})")
+            return found
         
-        logger.info(f"Total startup URLs found: {len(detail_urls)}")
+        logger.info("Getting startup URLs...")
+        
+        try:
+            try:
+                first_page = await self.get_startup_page(session, limit, 0, listing)
+            except Exception as e:
+                logger.error(f"Error getting URLs at offset 0: {e}")
+                return 0
+            
+            found = enqueue_page(first_page, 0)
+            total_count = first_page.get('meta', {}).get('totalCount', 0)
+            logger.info(f"Found {found} URLs at offset 0 (listing reports {total_count})")
+            
+            offsets = list(range(limit, total_count, limit))
+            if not incremental:
+                await asyncio.gather(*(fetch_page(offset) for offset in offsets))
+            else:
+                unchanged_pages = 0 if found else 1
+                for i in range(0, len(offsets), stop_after_unchanged_pages):
+                    if unchanged_pages >= stop_after_unchanged_pages:
+                        logger.info(f"Reached {unchanged_pages} unchanged pages, stopping listing at offset {offsets[i]}")
+                        break
+                    wave = await asyncio.gather(*(fetch_page(offset) for offset in offsets[i:i + stop_after_unchanged_pages]))
+                    for found in wave:
+                        # A failed page (None) could hide changes, so it resets the run
+                        unchanged_pages = unchanged_pages + 1 if found == 0 else 0
+            
+            logger.info(f"Total startup URLs found: {len(seen_ids)}, queued: {queued}")
+            return queued
+        finally:
+            queue.put_nowait(None)
+    
+    async def get_all_startup_urls(self, session: aiohttp.ClientSession) -> List[Dict[str, Any]]:
+        """Get all startup detail URLs from listings API"""
+        queue = asyncio.Queue()
+        await self.enqueue_startup_urls(session, queue)
+        
+        detail_urls = []
+        while (startup_info := queue.get_nowait()) is not None:
+            detail_urls.append(startup_info)
         return detail_urls
     
-    async def get_startup_details(self, session: aiohttp.ClientSession, startup_info: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    async def get_startup_details(self, session: aiohttp.ClientSession, startup_info: Dict[str, Any]) -> Dict[str, Any]:
         """Get detailed startup information with retry"""
-        try:
-            data = await self.fetch_json(session, startup_info['detail_url'])
-            cleaned_data = self.clean_data(data)
-            return cleaned_data
-            
-        except Exception as e:
-            logger.error(f"Failed to get details for {startup_info['title']}: {e}")
-            return None
+        data = await self.fetch_json(session, startup_info['detail_url'])
+        return self.clean_data(data)
     
     def clean_data(self, data: Dict[str, Any]) -> Dict[str, Any]:
         """Remove image, HTML and unnecessary fields"""
@@ -168,99 +428,375 @@ class StartupDetailsScraper:
         
         return cleaned
     
-    async def scrape_startup_batch(self, session: aiohttp.ClientSession, startup_urls: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-        """Scrape a batch of startups concurrently"""
-        tasks = []
-        for startup_info in startup_urls:
-            task = self.get_startup_details(session, startup_info)
-            tasks.append(task)
-        
-        results = await asyncio.gather(*tasks, return_exceptions=True)
-        
-        # Filter out None results and exceptions
-        successful_results = []
-        failed_count = 0
-        
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                logger.error(f"Exception for {startup_urls[i]['title']}: {result}")
-                failed_count += 1
-            elif result is not None:
-                successful_results.append(result)
-            else:
-                failed_count += 1
+    def is_permanent_failure(self, error: Exception) -> bool:
+        """Client errors other than rate limiting, and replay cache misses, will not succeed on retry"""
+        if isinstance(error, CacheMiss):
+            return True
+        return (isinstance(error, aiohttp.ClientResponseError)
+                and 400 <= error.status < 500 and error.status != 429)
+    
+    def write_dead_letter(self, startup_info: Dict[str, Any], attempts: int, error: Exception) -> None:
+        """Append a permanently failed startup to the dead-letter file"""
+        entry = dict(startup_info, attempts=attempts, error=str(error), failed_at=time.time())
+        with open(self.dead_letter_file, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+    
+    def load_dead_letters(self, filename: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Read dead-lettered startups back as detail URL entries"""
+        entries = {}
+        with open(filename or self.dead_letter_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                if line.strip():
+                    entry = json.loads(line)
+                    entries[entry['id']] = {k: entry[k] for k in ('id', 'title', 'detail_url')}
+        return list(entries.values())
+    
+    async def store_details(self, startup_info: Dict[str, Any], details: Dict[str, Any],
+                            results: List[Dict[str, Any]], writer: Optional[JsonlCheckpointWriter] = None,
+                            clean_writer: Optional[JsonlCheckpointWriter] = None,
+                            clean_executor: Optional[Executor] = None) -> None:
+        """Record a fetched startup and hand it to the configured outputs
         
-        if failed_count > 0:
-            logger.warning(f"Failed to scrape {failed_count} startups in this batch")
+        With a clean_executor the record also goes through DataCleaner in a
+        worker process, keeping the regex work off the event loop; cleaning
+        errors are logged per record as in DataCleaner.clean_all_startups.
+        Scrape state is only staged once the record is in every output, so a
+        checkpoint commit never covers a record still being cleaned; one
+        that fails to clean is left unrecorded and fetched again next run.
+        """
+        if clean_executor is None:
+            self.record_state(startup_info, details)
         
-        return successful_results
+        if writer:
+            writer.write(details)
+        elif clean_executor is None:
+            results.append(details)
+        self.scraped_count += 1
+        self.metrics.inc('scraper_records_total')
+        
+        if clean_executor is not None:
+            try:
+                cleaned = await asyncio.get_running_loop().run_in_executor(clean_executor, clean_startup_record, details)
+            except Exception as e:
+                logger.error(f"Error cleaning startup {startup_info['id']}: {e}")
+                if self.clean_summary is not None:
+                    self.clean_summary.add_failure('error')
+                return
+            if self.clean_summary is not None:
+                if cleaned:
+                    self.clean_summary.add(cleaned)
+                else:
+                    self.clean_summary.add_failure('empty')
+            if cleaned:  # Only add non-empty results
+                if clean_writer:
+                    clean_writer.write(cleaned)
+                else:
+                    results.append(cleaned)
+            self.record_state(startup_info, details)
     
-    async def scrape_all_details(self) -> List[Dict[str, Any]]:
-        """Scrape details for all startups"""
-        connector = aiohttp.TCPConnector(limit=100, limit_per_host=30)
-        timeout = aiohttp.ClientTimeout(total=60)
+    def record_state(self, startup_info: Dict[str, Any], details: Dict[str, Any]) -> None:
+        """Stage a scraped startup in the state store, counting it if its content is unchanged"""
+        if self.state_store and not self.state_store.record(startup_info, details):
+            self.unchanged_count += 1
+    
+    async def detail_worker(self, session: aiohttp.ClientSession, queue: DetailQueue, results: List[Dict[str, Any]],
+                            writer: Optional[JsonlCheckpointWriter] = None,
+                            clean_writer: Optional[JsonlCheckpointWriter] = None,
+                            clean_executor: Optional[Executor] = None) -> None:
+        """Fetch details from the queue until cancelled and pass them to store_details
         
-        async with aiohttp.ClientSession(connector=connector, timeout=timeout) as session:
-            # Get all URLs first
-            startup_urls = await self.get_all_startup_urls(session)
-            
-            if not startup_urls:
-                logger.error("No startup URLs found")
-                return []
+        A startup that cannot be stored (output write, state store or summary
+        error) is dead-lettered like a failed fetch, so the queue still drains.
+        """
+        while True:
+            attempt, startup_info = await queue.get()
+            requeued = False
+            try:
+                try:
+                    details = await self.get_startup_details(session, startup_info)
+                except Exception as e:
+                    attempt += 1
+                    if attempt < self.max_attempts and not self.is_permanent_failure(e):
+                        delay = min(self.retry_backoff * 2 ** (attempt - 1), 60)
+                        logger.warning(f"Requeueing {startup_info['title']} in {delay:.0f}s "
+                                       f"(attempt {attempt}/{self.max_attempts}): {e}")
+                        queue.requeue_later(startup_info, attempt, delay)
+                        self.metrics.inc('scraper_requeues_total')
+                        requeued = True
+                        continue
+                    
+                    logger.error(f"Giving up on {startup_info['title']} after {attempt} attempt(s): {e}")
+                    self.metrics.inc('scraper_dead_letters_total')
+                    self.write_dead_letter(startup_info, attempt, e)
+                    continue
+                
+                try:
+                    await self.store_details(startup_info, details, results, writer, clean_writer, clean_executor)
+                except Exception as e:
+                    logger.error(f"Error storing {startup_info['title']}: {e}")
+                    self.metrics.inc('scraper_dead_letters_total')
+                    self.write_dead_letter(startup_info, attempt + 1, e)
+                    continue
+                if self.scraped_count % 50 == 0:
+                    logger.info(f"Total scraped: {self.scraped_count}")
+            except Exception as e:
+                # Even the dead-letter file could not be written; never leave join() waiting
+                logger.error(f"Dropping {startup_info.get('title')}: {e}")
+            finally:
+                # A requeued item stays pending until its retry is processed
+                if not requeued:
+                    queue.task_done()
+    
+    async def scrape_all_details(self, startup_urls: Optional[List[Dict[str, Any]]] = None,
+                                 incremental: bool = False,
+                                 writer: Optional[JsonlCheckpointWriter] = None,
+                                 clean_writer: Optional[JsonlCheckpointWriter] = None,
+                                 clean_executor: Optional[Executor] = None) -> List[Dict[str, Any]]:
+        """Scrape details for all startups, or only for the given URL entries
+        
+        With incremental=True (requires a state store) only startups that are
+        new or changed since the last recorded scrape are fetched. With a
+        writer, records are streamed to it as they arrive. With a
+        clean_executor, records are also run through DataCleaner and the
+        cleaned ones go to clean_writer. Whatever has no writer is returned
+        in listing order (the given order for startup_urls), cleaned records
+        taking precedence over raw ones. Writers get records as they finish;
+        pass listing_ranks to compact_jsonl to restore listing order.
+        """
+        if incremental and self.state_store is None:
+            raise ValueError("Incremental scraping needs a state store")
+        self.unchanged_count = 0
+        self.scraped_count = 0
+        self.listing_ranks = {}
+        
+        async with self.create_session() as session:
+            queue = DetailQueue()
             
-            logger.info(f"Starting to scrape details for {len(startup_urls)} startups...")
+            if startup_urls is None:
+                # Listing pages feed the queue while workers are already fetching details
+                producer = asyncio.create_task(self.enqueue_startup_urls(session, queue, limit=self.PAGE_SIZE,
+                                                                        incremental=incremental))
+            else:
+                for rank, startup_info in enumerate(startup_urls):
+                    self.listing_ranks.setdefault(startup_info['id'], rank)
+                    queue.put_nowait(startup_info)
+                queue.put_nowait(None)
+                producer = None
             
+            # A fixed pool keeps max_concurrent detail requests in flight at all times
             all_details = []
-            batch_size = 50  # Process in batches to manage memory
+            workers = [
+                asyncio.create_task(self.detail_worker(session, queue, all_details, writer, clean_writer, clean_executor))
+                for _ in range(self.max_concurrent)
+            ]
             
-            for i in range(0, len(startup_urls), batch_size):
-                batch = startup_urls[i:i + batch_size]
-                batch_num = (i // batch_size) + 1
-                total_batches = (len(startup_urls) + batch_size - 1) // batch_size
-                
-                logger.info(f"Processing batch {batch_num}/{total_batches} ({len(batch)} startups)")
-                
-                batch_results = await self.scrape_startup_batch(session, batch)
-                all_details.extend(batch_results)
-                
-                logger.info(f"Batch {batch_num} completed. Total scraped: {len(all_details)}")
-                
-                # Brief pause between batches
-                if i + batch_size < len(startup_urls):
-                    await asyncio.sleep(1)
+            try:
+                await queue.join()
+            finally:
+                for worker in workers:
+                    worker.cancel()
+                await asyncio.gather(*workers, return_exceptions=True)
+            
+            total_urls = await producer if producer else len(startup_urls)
+            if not total_urls:
+                if incremental:
+                    logger.info("No new or changed startups")
+                else:
+                    logger.error("No startup URLs found")
+                return []
             
-            logger.info(f"Successfully scraped {len(all_details)} startup details")
+            failed = total_urls - self.scraped_count
+            if failed:
+                logger.warning(f"{failed} startups failed permanently, see {self.dead_letter_file}")
+            
+            if self.state_store:
+                logger.info(f"{self.unchanged_count} of the scraped startups had unchanged content")
+            if self.cache:
+                logger.info(f"Response cache: {self.cache.hits} replayed, {self.cache.not_modified} not modified, "
+                            f"{self.cache.misses} fetched")
+            
+            logger.info(f"Successfully scraped {self.scraped_count} startup details")
+            unranked = len(self.listing_ranks)
+            all_details.sort(key=lambda record: self.listing_ranks.get(record.get('id'), unranked))
             return all_details
     
+    def merge_with_existing(self, data: List[Dict[str, Any]], filename: str) -> List[Dict[str, Any]]:
+        """Merge freshly scraped records into an existing output file by id"""
+        try:
+            with open(filename, 'rb') as f:
+                existing = self.codec.loads(f.read())
+        except FileNotFoundError:
+            return data
+        
+        fresh = {record['id']: record for record in data}
+        merged = [fresh.pop(record['id'], record) for record in existing]
+        # Anything left is new; the listing is newest-first, so put it in front
+        return list(fresh.values()) + merged
+    
     def save_to_json(self, data: List[Dict[str, Any]], filename: str) -> None:
         """Save data to JSON file"""
         with open(filename, 'w', encoding='utf-8') as f:
-            json.dump(data, f, indent=2, ensure_ascii=False, default=str)
+            f.write(self.codec.dumps_pretty(data))
         logger.info(f"Saved {len(data)} records to {filename}")
 
+async def run_clean_pipeline(scraper: StartupDetailsScraper, state_store: ScrapeStateStore,
+                             args: argparse.Namespace) -> None:
+    """Scrape and clean in one pass, writing the clean output and summary directly"""
+    clean_jsonl = os.path.splitext(args.clean_output)[0] + '.jsonl'
+    raw_writer = (JsonlCheckpointWriter(args.jsonl, resume=args.resume, codec=scraper.codec)
+                  if args.keep_raw else None)
+    
+    def checkpoint() -> None:
+        # State is only committed once both outputs are on disk
+        if raw_writer:
+            raw_writer.checkpoint()
+        state_store.commit()
+    
+    clean_writer = JsonlCheckpointWriter(clean_jsonl, resume=args.resume, on_checkpoint=checkpoint,
+                                         codec=scraper.codec)
+    scraper.skip_ids = clean_writer.existing_ids
+    
+    # Summarise records as they are cleaned; on resume, seed it with those already on disk
+    scraper.clean_summary = DataSummary()
+    if clean_writer.existing_ids:
+        for record in read_jsonl(clean_jsonl, scraper.codec):
+            scraper.clean_summary.add(record)
+    
+    try:
+        with ProcessPoolExecutor(max_workers=args.clean_workers) as executor:
+            await scraper.scrape_all_details(writer=raw_writer, clean_writer=clean_writer, clean_executor=executor)
+    finally:
+        clean_writer.close()
+        if raw_writer:
+            raw_writer.close()
+    
+    if raw_writer and not args.no_compact:
+        compact_jsonl(args.jsonl, args.output, scraper.codec, scraper.listing_ranks)
+    total = compact_jsonl(clean_jsonl, args.clean_output, scraper.codec, scraper.listing_ranks)
+    if args.snapshot:
+        write_snapshot(read_jsonl(clean_jsonl, scraper.codec), args.snapshot)
+    
+    with open(args.summary_output, 'w', encoding='utf-8') as f:
+        json.dump(scraper.clean_summary.to_dict(), f, indent=2, ensure_ascii=False, default=str)
+    
+    logger.info(f"✅ Scrape-and-clean completed: {total} clean startups in {args.clean_output}")
+    logger.info(f"✅ Summary file: {args.summary_output}")
+
 async def main():
     """Main async function"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--output', default='startup_details.json', help='Output JSON file')
+    parser.add_argument('--jsonl', default='startup_details.jsonl',
+                        help='JSONL file records are streamed to during a full run')
+    parser.add_argument('--resume', action='store_true',
+                        help='Continue an interrupted full run, skipping ids already in the JSONL file')
+    parser.add_argument('--no-compact', action='store_true',
+                        help='Leave the JSONL file as the only output instead of compacting it into --output')
+    parser.add_argument('--dead-letter-file', default='dead_letters.jsonl',
+                        help='JSONL file collecting startups that failed permanently')
+    parser.add_argument('--retry-dead-letters', action='store_true',
+                        help='Re-scrape only the dead-lettered startups and merge them into the output')
+    parser.add_argument('--incremental', action='store_true',
+                        help='Fetch only new or changed startups and merge them into the output')
+    parser.add_argument('--state-db', default='scrape_state.db',
+                        help='SQLite file tracking what was scraped, used by --incremental')
+    parser.add_argument('--cache-dir', default='.http_cache', help='Directory of the on-disk response cache')
+    parser.add_argument('--no-cache', action='store_true', help='Disable the response cache')
+    parser.add_argument('--replay', action='store_true',
+                        help='Serve every request from the response cache without touching the network')
+    parser.add_argument('--clean', action='store_true',
+                        help='Run DataCleaner on each record as it arrives and write the clean output and summary directly')
+    parser.add_argument('--clean-workers', type=int, default=None,
+                        help='Processes used for --clean (default: CPU count)')
+    parser.add_argument('--keep-raw', action='store_true',
+                        help='With --clean, also write the raw JSONL/--output files')
+    parser.add_argument('--clean-output', default='startup_details_clean.json', help='Clean JSON file for --clean')
+    parser.add_argument('--summary-output', default='data_summary.json', help='Summary JSON file for --clean')
+    parser.add_argument('--snapshot', default=None,
+                        help='Also write a compressed JSONL snapshot with an id index (clean records with --clean)')
+    parser.add_argument('--metrics-file', default=None,
+                        help='Write request metrics here at the end of the run (.prom/.txt for Prometheus text, else JSON)')
+    parser.add_argument('--metrics-interval', type=float, default=0,
+                        help='Also rewrite --metrics-file every this many seconds during the run')
+    parser.add_argument('--json-backend', choices=BACKENDS, default='auto',
+                        help="JSON library for responses and output files (auto: orjson if installed); "
+                             "'stdlib' keeps output byte-identical to earlier versions")
+    args = parser.parse_args()
+    
     logger.info("Starting async startup details scraper...")
     
     # Initialize scraper with moderate concurrency
-    scraper = StartupDetailsScraper(max_concurrent=10, request_delay=0.3)
+    if args.replay and args.no_cache:
+        parser.error("--replay needs the response cache")
+    if args.incremental and (args.clean or args.snapshot):
+        parser.error("--incremental only merges into --output; it cannot be combined with --clean or --snapshot")
+    if args.retry_dead_letters and (args.clean or args.snapshot or args.incremental):
+        parser.error("--retry-dead-letters only merges into --output; "
+                     "it cannot be combined with --clean, --snapshot or --incremental")
+    
+    state_store = ScrapeStateStore(args.state_db)
+    cache = None if args.no_cache else ResponseCache(args.cache_dir)
+    metrics, metrics_dumper = start_metrics(args.metrics_file, args.metrics_interval)
+    scraper = StartupDetailsScraper(max_concurrent=10, request_delay=0.3,
+                                    dead_letter_file=args.dead_letter_file,
+                                    state_store=state_store,
+                                    cache=cache, replay=args.replay,
+                                    metrics=metrics, codec=get_codec(args.json_backend))
     
     try:
-        # Scrape all startup details
-        all_details = await scraper.scrape_all_details()
+        if args.retry_dead_letters:
+            # Move the old dead letters aside so fresh failures start a new file. They are
+            # appended to any .replay left by a crashed retry, so that backlog is retried too
+            replay_file = args.dead_letter_file + '.replay'
+            if os.path.exists(args.dead_letter_file):
+                with open(args.dead_letter_file, 'rb') as src, open(replay_file, 'ab') as dst:
+                    shutil.copyfileobj(src, dst)
+                    dst.flush()
+                    os.fsync(dst.fileno())
+                os.remove(args.dead_letter_file)
+            if not os.path.exists(replay_file):
+                logger.info(f"No dead letters to retry in {args.dead_letter_file}")
+                return
+            startup_urls = scraper.load_dead_letters(replay_file)
+            logger.info(f"Retrying {len(startup_urls)} dead-lettered startups")
+            
+            all_details = await scraper.scrape_all_details(startup_urls)
+            scraper.save_to_json(scraper.merge_with_existing(all_details, args.output), args.output)
+            state_store.commit()
+            os.remove(replay_file)
+            return
         
-        if all_details:
-            # Save to JSON
-            scraper.save_to_json(all_details, 'startup_details.json')
+        if args.incremental:
+            all_details = await scraper.scrape_all_details(incremental=True)
+            if all_details:
+                scraper.save_to_json(scraper.merge_with_existing(all_details, args.output), args.output)
+                state_store.commit()
+            logger.info(f"📊 Incremental run fetched {len(all_details)} new or changed startups")
+            return
+        
+        if args.clean:
+            await run_clean_pipeline(scraper, state_store, args)
+            return
+        
+        # Stream all startup details to JSONL, committing scrape state at each fsync
+        writer = JsonlCheckpointWriter(args.jsonl, resume=args.resume, on_checkpoint=state_store.commit,
+                                       codec=scraper.codec)
+        scraper.skip_ids = writer.existing_ids
+        try:
+            await scraper.scrape_all_details(writer=writer)
+        finally:
+            writer.close()
+        
+        total = len(writer.existing_ids) + writer.count
+        if total:
+            if not args.no_compact:
+                compact_jsonl(args.jsonl, args.output, scraper.codec, scraper.listing_ranks)
+            if args.snapshot:
+                write_snapshot(read_jsonl(args.jsonl, scraper.codec), args.snapshot)
             
             # Show summary
             logger.info(f"✅ Scraping completed successfully!")
-            logger.info(f"📊 Total startups scraped: {len(all_details)}")
-            
-            # Sample data
-            if all_details:
-                sample = all_details[0]
-                logger.info(f"📋 Sample startup: {sample.get('title', 'N/A')}")
+            logger.info(f"📊 Total startups scraped: {total} ({writer.count} in this run)")
         else:
             logger.error("No data scraped")
         
@@ -269,6 +805,11 @@ async def main():
     except Exception as e:
         logger.error(f"Scraping failed: {e}")
         raise
+    finally:
+        finish_metrics(metrics, args.metrics_file, metrics_dumper)
+        state_store.close()
+        if cache:
+            cache.close()
 
 if __name__ == "__main__":
     asyncio.run(main())
\ No newline at end of file
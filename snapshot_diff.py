@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+Changefeed between two scrapes of startup data
+Hash-joins two snapshots (JSON array, JSONL or indexed snapshot) on id and
+writes added, removed and changed records with field-level changes as JSONL
+
+Examples:
+    python snapshot_diff.py old/startup_details.json startup_details.json --output changes.jsonl
+    python snapshot_diff.py old.jsonl.gz new.jsonl.gz --ignore scrapedAt
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import sys
+from typing import Any, Dict, Iterable, Iterator, Tuple
+
+from snapshot_store import SnapshotReader, index_path, iter_records
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+DIGEST_SIZE = 8
+
+def field_digest(value: Any) -> bytes:
+    # Text fields dominate, so they skip JSON encoding; the prefix keeps "1" and 1 apart
+    if isinstance(value, str):
+        encoded = 's' + value
+    else:
+        encoded = 'j' + json.dumps(value, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.blake2b(encoded.encode('utf-8', 'surrogatepass'), digest_size=DIGEST_SIZE).digest()
+
+class RecordFingerprint:
+    """Per-field content hashes of one record, without the record itself
+
+    Field names are shared between records with the same layout and the
+    digests are packed into one bytes object, so the old side of a diff
+    costs a few hundred bytes per record however large the records are.
+    """
+
+    __slots__ = ('fields', 'digests')
+
+    _layouts: Dict[Tuple[str, ...], Tuple[str, ...]] = {}
+
+    def __init__(self, record: Dict[str, Any], ignore: frozenset = frozenset()):
+        fields = tuple(sorted(key for key in record if key not in ignore))
+        self.fields = self._layouts.setdefault(fields, fields)
+        self.digests = b''.join(field_digest(record[field]) for field in fields)
+
+    def field_digests(self) -> Dict[str, bytes]:
+        return {field: self.digests[i * DIGEST_SIZE:(i + 1) * DIGEST_SIZE]
+                for i, field in enumerate(self.fields)}
+
+    def __eq__(self, other: 'RecordFingerprint') -> bool:
+        return self.fields == other.fields and self.digests == other.digests
+
+def diff_snapshots(old_records: Iterable[Dict[str, Any]], new_records: Iterable[Dict[str, Any]],
+                   ignore: Iterable[str] = (), old_lookup=None) -> Iterator[Dict[str, Any]]:
+    """Yield change events between two record streams
+
+    The old stream is read once into a table of fingerprints; the new stream
+    is then joined against it record by record, so changes are emitted as
+    soon as they are found. old_lookup, if given, fetches a full old record
+    by id to include previous values in the events.
+    """
+    ignore = frozenset(ignore)
+    old_index: Dict[Any, RecordFingerprint] = {}
+    for record in old_records:
+        old_index[record.get('id')] = RecordFingerprint(record, ignore)
+
+    for record in new_records:
+        record_id = record.get('id')
+        new_fp = RecordFingerprint(record, ignore)
+        old_fp = old_index.pop(record_id, None)
+
+        if old_fp is None:
+            yield {'op': 'added', 'id': record_id, 'record': record}
+            continue
+        if old_fp == new_fp:
+            continue
+
+        old_digests = old_fp.field_digests()
+        new_digests = new_fp.field_digests()
+        changed = [field for field in new_fp.fields if old_digests.get(field) != new_digests[field]]
+        removed = [field for field in old_fp.fields if field not in new_digests]
+
+        event = {
+            'op': 'changed',
+            'id': record_id,
+            'changed': {field: record[field] for field in changed},
+            'removed_fields': removed,
+        }
+        if old_lookup:
+            before = old_lookup(record_id) or {}
+            event['before'] = {field: before.get(field) for field in changed + removed}
+        yield event
+
+    # Whatever was not matched by the new stream has disappeared
+    for record_id in old_index:
+        yield {'op': 'removed', 'id': record_id}
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('old', help='Earlier snapshot')
+    parser.add_argument('new', help='Later snapshot')
+    parser.add_argument('--output', default=None, help='JSONL file for change events (default: stdout)')
+    parser.add_argument('--ignore', action='append', default=[],
+                        help='Field to leave out of the comparison (repeatable)')
+    args = parser.parse_args()
+
+    # Previous values are only included when the old side supports random access
+    old_reader = SnapshotReader(args.old) if os.path.exists(index_path(args.old)) else None
+    counts = {'added': 0, 'removed': 0, 'changed': 0}
+
+    out = open(args.output, 'w', encoding='utf-8') if args.output else sys.stdout
+    try:
+        events = diff_snapshots(iter_records(args.old), iter_records(args.new), ignore=args.ignore,
+                                old_lookup=old_reader.get if old_reader else None)
+        for event in events:
+            counts[event['op']] += 1
+            out.write(json.dumps(event, ensure_ascii=False, default=str) + '\n')
+    finally:
+        if args.output:
+            out.close()
+        if old_reader:
+            old_reader.close()
+
+    logger.info(f"✅ {counts['added']} added, {counts['removed']} removed, {counts['changed']} changed")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,267 @@
+#!/usr/bin/env python3
+"""
+Compressed JSONL snapshots of startup records with an id -> offset index
+Records are written as independently compressed frames (zstd if installed,
+otherwise gzip) so single records and id ranges can be read via mmap
+
+Examples:
+    python snapshot_store.py write startup_details_clean.json startups.jsonl.gz
+    python snapshot_store.py get startups.jsonl.gz 52011 52012
+    python snapshot_store.py range startups.jsonl.gz --min 52000 --max 52100
+"""
+
+import argparse
+import bisect
+import json
+import logging
+import mmap
+import os
+import struct
+import zlib
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from jsonl_store import iter_json_array, read_jsonl
+
+try:
+    import zstandard
+except ImportError:  # Optional: gzip is always available
+    zstandard = None
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_MAGIC = b'KSIDX1\n\0'
+# id, frame offset, frame length, line number within the frame
+INDEX_ENTRY = struct.Struct('<qQII')
+
+GZIP_MAGIC = b'\x1f\x8b'
+ZSTD_MAGIC = b'\x28\xb5\x2f\xfd'
+
+def default_codec() -> str:
+    return 'zstd' if zstandard is not None else 'gzip'
+
+def index_path(path: str) -> str:
+    return path + '.idx'
+
+class SnapshotWriter:
+    """Write records as compressed JSONL frames plus a sorted id index
+
+    Every records_per_frame records form one gzip member or zstd frame, so
+    the file is still a valid .gz/.zst stream for zcat/zstdcat, while a
+    reader only has to decompress one frame to get a record. Both files are
+    written under temporary names and moved into place on close().
+    """
+
+    def __init__(self, path: str, codec: Optional[str] = None, records_per_frame: int = 16,
+                 level: Optional[int] = None):
+        self.path = path
+        self.codec = codec or default_codec()
+        self.records_per_frame = records_per_frame
+        self.count = 0
+
+        if self.codec == 'zstd':
+            if zstandard is None:
+                raise RuntimeError("zstd snapshots need the 'zstandard' package (pip install zstandard)")
+            self._compress = zstandard.ZstdCompressor(level=level or 10).compress
+        elif self.codec == 'gzip':
+            gzip_level = level or 9
+            self._compress = lambda data: self._gzip_member(data, gzip_level)
+        else:
+            raise ValueError(f"Unknown snapshot codec: {self.codec!r}")
+
+        self._offset = 0
+        self._lines: List[bytes] = []
+        self._ids: List[int] = []
+        self._index: List[Tuple[int, int, int, int]] = []
+        self._file = open(path + '.tmp', 'wb')
+
+    @staticmethod
+    def _gzip_member(data: bytes, level: int) -> bytes:
+        compressor = zlib.compressobj(level, zlib.DEFLATED, 31)
+        return compressor.compress(data) + compressor.flush()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        record_id = record.get('id')
+        if not isinstance(record_id, int):
+            raise ValueError(f"Snapshot records need an integer id, got {record_id!r}")
+        line = json.dumps(record, ensure_ascii=False, default=str) + '\n'
+        self._lines.append(line.encode('utf-8'))
+        self._ids.append(record_id)
+        self.count += 1
+        if len(self._lines) >= self.records_per_frame:
+            self._flush_frame()
+
+    def _flush_frame(self) -> None:
+        if not self._lines:
+            return
+        frame = self._compress(b''.join(self._lines))
+        self._file.write(frame)
+        for line_no, record_id in enumerate(self._ids):
+            self._index.append((record_id, self._offset, len(frame), line_no))
+        self._offset += len(frame)
+        self._lines, self._ids = [], []
+
+    def close(self) -> None:
+        self._flush_frame()
+        self._file.close()
+
+        # Later records win if an id repeats, matching merge_with_existing
+        self._index.sort(key=lambda entry: entry[0])
+        entries = {entry[0]: entry for entry in self._index}
+        with open(index_path(self.path) + '.tmp', 'wb') as f:
+            f.write(INDEX_MAGIC)
+            for entry in entries.values():
+                f.write(INDEX_ENTRY.pack(*entry))
+
+        os.replace(self.path + '.tmp', self.path)
+        os.replace(index_path(self.path) + '.tmp', index_path(self.path))
+
+    def __enter__(self) -> 'SnapshotWriter':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        if exc_type is None:
+            self.close()
+        else:
+            self._file.close()
+            os.remove(self.path + '.tmp')
+
+class SnapshotReader:
+    """Random access to a snapshot written by SnapshotWriter
+
+    The data file is memory-mapped and only the frames holding the requested
+    ids are decompressed. The last decompressed frame is kept, so reading
+    neighbouring ids in order costs one decompression per frame.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        with open(index_path(path), 'rb') as f:
+            raw = f.read()
+        if not raw.startswith(INDEX_MAGIC):
+            raise ValueError(f"{index_path(path)} is not a snapshot index")
+
+        entries = list(INDEX_ENTRY.iter_unpack(memoryview(raw)[len(INDEX_MAGIC):]))
+        self.ids = [entry[0] for entry in entries]
+        self._entries = entries
+
+        self._file = open(path, 'rb')
+        size = os.fstat(self._file.fileno()).st_size
+        self._mmap = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ) if size else b''
+        self._decompress = self._decompressor(self._mmap[:4])
+        self._cached_frame: Tuple[int, List[bytes]] = (-1, [])
+
+    @staticmethod
+    def _decompressor(magic: bytes):
+        if magic.startswith(ZSTD_MAGIC):
+            if zstandard is None:
+                raise RuntimeError("Reading zstd snapshots needs the 'zstandard' package")
+            return zstandard.ZstdDecompressor().decompress
+        return lambda frame: zlib.decompress(frame, 31)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __contains__(self, record_id: int) -> bool:
+        i = bisect.bisect_left(self.ids, record_id)
+        return i < len(self.ids) and self.ids[i] == record_id
+
+    def _frame_lines(self, offset: int, length: int) -> List[bytes]:
+        if self._cached_frame[0] != offset:
+            data = self._decompress(self._mmap[offset:offset + length])
+            self._cached_frame = (offset, data.splitlines())
+        return self._cached_frame[1]
+
+    def _load(self, entry: Tuple[int, int, int, int]) -> Dict[str, Any]:
+        _, offset, length, line_no = entry
+        return json.loads(self._frame_lines(offset, length)[line_no])
+
+    def get(self, record_id: int) -> Optional[Dict[str, Any]]:
+        i = bisect.bisect_left(self.ids, record_id)
+        if i < len(self.ids) and self.ids[i] == record_id:
+            return self._load(self._entries[i])
+        return None
+
+    def range(self, min_id: Optional[int] = None, max_id: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """Yield records with min_id <= id <= max_id in id order"""
+        start = 0 if min_id is None else bisect.bisect_left(self.ids, min_id)
+        stop = len(self.ids) if max_id is None else bisect.bisect_right(self.ids, max_id)
+        for entry in self._entries[start:stop]:
+            yield self._load(entry)
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        return self.range()
+
+    def close(self) -> None:
+        if isinstance(self._mmap, mmap.mmap):
+            self._mmap.close()
+        self._file.close()
+
+    def __enter__(self) -> 'SnapshotReader':
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        self.close()
+
+def write_snapshot(records: Iterable[Dict[str, Any]], path: str, codec: Optional[str] = None) -> int:
+    """Write records to a compressed snapshot with its index"""
+    with SnapshotWriter(path, codec=codec) as writer:
+        for record in records:
+            writer.write(record)
+    logger.info(f"Wrote {writer.count} records to {writer.codec} snapshot {path}")
+    return writer.count
+
+def iter_records(path: str) -> Iterator[Dict[str, Any]]:
+    """Records from a snapshot, JSONL file or JSON array"""
+    if os.path.exists(index_path(path)):
+        with SnapshotReader(path) as reader:
+            yield from reader
+    elif path.endswith('.jsonl'):
+        yield from read_jsonl(path)
+    else:
+        yield from iter_json_array(path)
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    write_parser = commands.add_parser('write', help='Build a snapshot from a JSON array or JSONL file')
+    write_parser.add_argument('input')
+    write_parser.add_argument('snapshot')
+    write_parser.add_argument('--codec', choices=['zstd', 'gzip'], default=None,
+                              help='Compression (default: zstd if installed, else gzip)')
+
+    get_parser = commands.add_parser('get', help='Print the records with the given ids')
+    get_parser.add_argument('snapshot')
+    get_parser.add_argument('ids', type=int, nargs='+')
+
+    range_parser = commands.add_parser('range', help='Print the records in an id range')
+    range_parser.add_argument('snapshot')
+    range_parser.add_argument('--min', type=int, default=None)
+    range_parser.add_argument('--max', type=int, default=None)
+
+    args = parser.parse_args()
+
+    if args.command == 'write':
+        count = write_snapshot(iter_records(args.input), args.snapshot, codec=args.codec)
+        input_size = os.path.getsize(args.input)
+        output_size = os.path.getsize(args.snapshot) + os.path.getsize(index_path(args.snapshot))
+        logger.info(f"✅ {count} startups: {input_size / 1024:.0f} KB -> {output_size / 1024:.0f} KB "
+                    f"({output_size / input_size:.0%}) including index")
+        return
+
+    with SnapshotReader(args.snapshot) as reader:
+        if args.command == 'get':
+            for record_id in args.ids:
+                record = reader.get(record_id)
+                if record is None:
+                    logger.warning(f"Startup {record_id} not in {args.snapshot}")
+                else:
+                    print(json.dumps(record, ensure_ascii=False))
+        else:
+            for record in reader.range(args.min, args.max):
+                print(json.dumps(record, ensure_ascii=False))
+
+if __name__ == "__main__":
+    main()
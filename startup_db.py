@@ -0,0 +1,293 @@
+#!/usr/bin/env python3
+"""
+SQLite export and query tool for cleaned startup data
+Loads startup_details_clean.json into indexed tables with FTS5 full-text search
+
+Examples:
+    python startup_db.py load
+    python startup_db.py query --trl-min 6 --category "Decision Intelligence" --looking-for funding
+    python startup_db.py query --text "sensor OR monitoring" --limit 5
+"""
+
+import argparse
+import json
+import logging
+import sqlite3
+import time
+from typing import Any, Dict, Iterable, List, Optional
+
+from jsonl_store import iter_json_array
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+# sqlite3 error messages for a malformed FTS5 MATCH expression, as opposed to a missing table etc.
+FTS_QUERY_ERRORS = ('fts5: syntax error', 'no such column', 'unterminated string')
+
+SCHEMA = """
+CREATE TABLE startups (
+    id INTEGER PRIMARY KEY,
+    payoff TEXT,
+    abstract TEXT,
+    trl INTEGER,
+    trl_label TEXT,
+    funding_stage TEXT,
+    funding_stage_label TEXT,
+    status TEXT,
+    status_label TEXT,
+    data TEXT NOT NULL
+);
+CREATE INDEX startups_trl ON startups (trl);
+CREATE INDEX startups_funding_stage ON startups (funding_stage);
+CREATE INDEX startups_status ON startups (status);
+
+CREATE TABLE categories (id INTEGER PRIMARY KEY, group_id INTEGER, name TEXT NOT NULL);
+CREATE TABLE startup_categories (
+    startup_id INTEGER NOT NULL REFERENCES startups (id),
+    category_id INTEGER NOT NULL REFERENCES categories (id),
+    PRIMARY KEY (category_id, startup_id)
+);
+CREATE INDEX categories_name ON categories (name);
+
+CREATE TABLE tags (id INTEGER PRIMARY KEY, name TEXT NOT NULL);
+CREATE TABLE startup_tags (
+    startup_id INTEGER NOT NULL REFERENCES startups (id),
+    tag_id INTEGER NOT NULL REFERENCES tags (id),
+    PRIMARY KEY (tag_id, startup_id)
+);
+CREATE INDEX tags_name ON tags (name);
+
+CREATE TABLE owners (id INTEGER PRIMARY KEY, name TEXT NOT NULL, organization_type TEXT);
+CREATE TABLE startup_owners (
+    startup_id INTEGER NOT NULL REFERENCES startups (id),
+    owner_id INTEGER NOT NULL REFERENCES owners (id),
+    PRIMARY KEY (owner_id, startup_id)
+);
+
+CREATE TABLE startup_looking_for (
+    startup_id INTEGER NOT NULL REFERENCES startups (id),
+    value TEXT NOT NULL,
+    label TEXT,
+    PRIMARY KEY (value, startup_id)
+);
+
+CREATE VIRTUAL TABLE startups_fts USING fts5 (
+    payoff, abstract, description, enabling_technologies, main_applications,
+    target_customers, competitive_advantages
+);
+"""
+
+# FTS column -> field in the cleaned record
+FTS_FIELDS = {
+    'payoff': 'payoff',
+    'abstract': 'abstract',
+    'description': 'description',
+    'enabling_technologies': 'enablingTechnologies',
+    'main_applications': 'mainApplications',
+    'target_customers': 'targetCustomers',
+    'competitive_advantages': 'competitiveAdvantages',
+}
+
+def option_field(value: Any, key: str) -> Optional[Any]:
+    """Read label/value from a {label, value} option object"""
+    return value.get(key) if isinstance(value, dict) else None
+
+class StartupDatabase:
+    """Indexed SQLite store of cleaned startups"""
+
+    def __init__(self, path: str = 'startups.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.row_factory = sqlite3.Row
+
+    def rebuild(self, startups: Iterable[Dict[str, Any]], batch_size: int = 1000) -> int:
+        """Replace the database contents with the given startups, in one transaction
+
+        If loading fails part-way everything is rolled back, leaving the
+        previous contents in place.
+        """
+        tables = [row[0] for row in self.conn.execute(
+            "SELECT name FROM sqlite_master WHERE type = 'table' AND name NOT LIKE 'startups_fts_%'")]
+
+        count = 0
+        batch = []
+        # executescript() would commit first, so the schema goes in statement by statement
+        self.conn.execute("BEGIN")
+        try:
+            for table in tables:
+                self.conn.execute(f"DROP TABLE IF EXISTS {table}")
+            for statement in SCHEMA.split(';'):
+                if statement.strip():
+                    self.conn.execute(statement)
+
+            for startup in startups:
+                batch.append(startup)
+                if len(batch) >= batch_size:
+                    self._insert_batch(batch)
+                    count += len(batch)
+                    batch = []
+            if batch:
+                self._insert_batch(batch)
+                count += len(batch)
+            self.conn.commit()
+        except BaseException:
+            self.conn.rollback()
+            raise
+
+        self.conn.execute("ANALYZE")
+        return count
+
+    def _insert_batch(self, startups: List[Dict[str, Any]]) -> None:
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO startups VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+            [(
+                s['id'], s.get('payoff'), s.get('abstract'),
+                option_field(s.get('trl'), 'value'), option_field(s.get('trl'), 'label'),
+                option_field(s.get('fundingStage'), 'value'), option_field(s.get('fundingStage'), 'label'),
+                option_field(s.get('status'), 'value'), option_field(s.get('status'), 'label'),
+                json.dumps(s, ensure_ascii=False),
+            ) for s in startups]
+        )
+        self.conn.executemany(
+            f"INSERT INTO startups_fts (rowid, {', '.join(FTS_FIELDS)}) VALUES (?{', ?' * len(FTS_FIELDS)})",
+            [(s['id'], *(s.get(field) or '' for field in FTS_FIELDS.values())) for s in startups]
+        )
+
+        categories, tags, owners = {}, {}, {}
+        startup_categories, startup_tags, startup_owners, looking_for = set(), set(), set(), set()
+        for s in startups:
+            for category in s.get('categories', []):
+                categories[category['id']] = (category['id'], category.get('group'), category['name'])
+                startup_categories.add((s['id'], category['id']))
+            for tag in s.get('tags', []):
+                tags[tag['id']] = (tag['id'], tag['name'])
+                startup_tags.add((s['id'], tag['id']))
+            for owner in s.get('owners', []):
+                owners[owner['id']] = (owner['id'], owner['name'], owner.get('organizationType'))
+                startup_owners.add((s['id'], owner['id']))
+            for option in s.get('lookingFor', []):
+                looking_for.add((s['id'], option['value'], option.get('label')))
+
+        self.conn.executemany("INSERT OR REPLACE INTO categories VALUES (?, ?, ?)", categories.values())
+        self.conn.executemany("INSERT OR REPLACE INTO tags VALUES (?, ?)", tags.values())
+        self.conn.executemany("INSERT OR REPLACE INTO owners VALUES (?, ?, ?)", owners.values())
+        self.conn.executemany("INSERT OR IGNORE INTO startup_categories VALUES (?, ?)", startup_categories)
+        self.conn.executemany("INSERT OR IGNORE INTO startup_tags VALUES (?, ?)", startup_tags)
+        self.conn.executemany("INSERT OR IGNORE INTO startup_owners VALUES (?, ?)", startup_owners)
+        self.conn.executemany("INSERT OR IGNORE INTO startup_looking_for VALUES (?, ?, ?)", looking_for)
+
+    def query(self, text: Optional[str] = None, trl_min: Optional[int] = None, trl_max: Optional[int] = None,
+              category: Optional[str] = None, tag: Optional[str] = None, owner: Optional[str] = None,
+              funding_stage: Optional[str] = None, status: Optional[str] = None,
+              looking_for: Optional[str] = None, limit: int = 20) -> List[sqlite3.Row]:
+        """Find startups matching all given filters; text uses FTS5 query syntax"""
+        joins, where, params = [], [], []
+
+        if text:
+            joins.append("JOIN startups_fts ON startups_fts.rowid = s.id")
+            where.append("startups_fts MATCH ?")
+            params.append(text)
+        if trl_min is not None:
+            where.append("s.trl >= ?")
+            params.append(trl_min)
+        if trl_max is not None:
+            where.append("s.trl <= ?")
+            params.append(trl_max)
+        if funding_stage:
+            where.append("s.funding_stage = ?")
+            params.append(funding_stage)
+        if status:
+            where.append("s.status = ?")
+            params.append(status)
+        if category:
+            where.append("s.id IN (SELECT sc.startup_id FROM startup_categories sc "
+                         "JOIN categories c ON c.id = sc.category_id WHERE c.name = ?)")
+            params.append(category)
+        if tag:
+            where.append("s.id IN (SELECT st.startup_id FROM startup_tags st "
+                         "JOIN tags t ON t.id = st.tag_id WHERE t.name = ?)")
+            params.append(tag)
+        if owner:
+            where.append("s.id IN (SELECT so.startup_id FROM startup_owners so "
+                         "JOIN owners o ON o.id = so.owner_id WHERE o.name = ?)")
+            params.append(owner)
+        if looking_for:
+            where.append("s.id IN (SELECT startup_id FROM startup_looking_for WHERE value = ?)")
+            params.append(looking_for)
+
+        sql = "SELECT s.id, s.payoff, s.trl, s.funding_stage, s.status, s.abstract FROM startups s"
+        if joins:
+            sql += " " + " ".join(joins)
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY bm25(startups_fts)" if text else " ORDER BY s.id DESC"
+        sql += " LIMIT ?"
+        params.append(limit)
+
+        return self.conn.execute(sql, params).fetchall()
+
+    def get(self, startup_id: int) -> Optional[Dict[str, Any]]:
+        row = self.conn.execute("SELECT data FROM startups WHERE id = ?", (startup_id,)).fetchone()
+        return json.loads(row['data']) if row else None
+
+    def close(self) -> None:
+        self.conn.close()
+
+def main():
+    """Command line entry point"""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--db', default='startups.db', help='SQLite database file')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    load_parser = commands.add_parser('load', help='Rebuild the database from cleaned startups')
+    load_parser.add_argument('--input', default='startup_details_clean.json', help='Cleaned JSON array')
+
+    query_parser = commands.add_parser('query', help='Search the database')
+    query_parser.add_argument('--text', help='Full-text query over abstract, description and other text fields')
+    query_parser.add_argument('--trl-min', type=int)
+    query_parser.add_argument('--trl-max', type=int)
+    query_parser.add_argument('--category', help='Category name, e.g. "Digitization"')
+    query_parser.add_argument('--tag', help='Tag name, e.g. "Artificial Intelligence"')
+    query_parser.add_argument('--owner', help='Owner organisation name')
+    query_parser.add_argument('--funding-stage', help='Funding stage value, e.g. "seed"')
+    query_parser.add_argument('--status', help='Status value, e.g. "formed"')
+    query_parser.add_argument('--looking-for', help='lookingFor value, e.g. "funding"')
+    query_parser.add_argument('--limit', type=int, default=20)
+    query_parser.add_argument('--json', action='store_true', help='Print the full records as JSON')
+
+    args = parser.parse_args()
+    db = StartupDatabase(args.db)
+
+    try:
+        if args.command == 'load':
+            start = time.perf_counter()
+            count = db.rebuild(iter_json_array(args.input))
+            logger.info(f"✅ Loaded {count} startups from {args.input} into {args.db} "
+                        f"in {time.perf_counter() - start:.2f}s")
+            return
+
+        start = time.perf_counter()
+        try:
+            rows = db.query(text=args.text, trl_min=args.trl_min, trl_max=args.trl_max,
+                            category=args.category, tag=args.tag, owner=args.owner,
+                            funding_stage=args.funding_stage, status=args.status,
+                            looking_for=args.looking_for, limit=args.limit)
+        except sqlite3.OperationalError as e:
+            if not args.text or not str(e).startswith(FTS_QUERY_ERRORS):
+                raise
+            parser.error(f"invalid --text query {args.text!r} ({e}); "
+                         f"put terms with punctuation in double quotes, e.g. '\"co-founder\"'")
+        elapsed = (time.perf_counter() - start) * 1000
+
+        for row in rows:
+            if args.json:
+                print(json.dumps(db.get(row['id']), ensure_ascii=False))
+            else:
+                print(f"{row['id']:>6}  TRL {row['trl'] or '-':<2} {row['funding_stage'] or '-':<14} "
+                      f"{(row['payoff'] or row['abstract'] or '')[:90]}")
+        logger.info(f"{len(rows)} startups in {elapsed:.1f} ms")
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Persistent scrape state for incremental runs
+Records, per startup id, the listing revision marker and a content hash
+"""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import time
+from typing import Dict, Any, Tuple, Optional
+
+logger = logging.getLogger(__name__)
+
+def content_hash(data: Any) -> str:
+    """Stable hash of a JSON-serialisable value"""
+    encoded = json.dumps(data, sort_keys=True, ensure_ascii=False, separators=(',', ':'), default=str)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+class ScrapeStateStore:
+    """SQLite-backed record of what each startup looked like when last scraped
+
+    Updates are staged in an open transaction and only become durable on
+    commit(), which callers should invoke after the output file is written.
+    A crash in between then leaves the affected ids marked as changed.
+    """
+
+    def __init__(self, path: str = 'scrape_state.db'):
+        self.path = path
+        self.conn = sqlite3.connect(path)
+        self.conn.execute("""
+            CREATE TABLE IF NOT EXISTS startups (
+                id INTEGER PRIMARY KEY,
+                published_at TEXT,
+                listing_hash TEXT,
+                content_hash TEXT,
+                scraped_at REAL
+            )
+        """)
+        self.conn.commit()
+
+        # Listing markers are checked for every item on every page, so keep them in memory
+        self.known: Dict[int, Tuple[Optional[str], Optional[str]]] = {
+            row[0]: (row[1], row[2])
+            for row in self.conn.execute("SELECT id, published_at, listing_hash FROM startups")
+        }
+        logger.info(f"Loaded scrape state for {len(self.known)} startups from {path}")
+
+    def is_changed(self, startup_info: Dict[str, Any]) -> bool:
+        """True if the listing entry is new or differs from the last scrape"""
+        marker = (startup_info.get('published_at'), startup_info.get('listing_hash'))
+        return self.known.get(startup_info['id']) != marker
+
+    def record(self, startup_info: Dict[str, Any], details: Dict[str, Any]) -> bool:
+        """Stage the state of a scraped startup; returns True if its content changed"""
+        new_hash = content_hash(details)
+        row = self.conn.execute("SELECT content_hash FROM startups WHERE id = ?", (startup_info['id'],)).fetchone()
+
+        self.conn.execute("""
+            INSERT INTO startups (id, published_at, listing_hash, content_hash, scraped_at)
+            VALUES (?, ?, ?, ?, ?)
+            ON CONFLICT(id) DO UPDATE SET
+                published_at = excluded.published_at,
+                listing_hash = excluded.listing_hash,
+                content_hash = excluded.content_hash,
+                scraped_at = excluded.scraped_at
+        """, (startup_info['id'], startup_info.get('published_at'), startup_info.get('listing_hash'),
+              new_hash, time.time()))
+        self.known[startup_info['id']] = (startup_info.get('published_at'), startup_info.get('listing_hash'))
+
+        return row is None or row[0] != new_hash
+
+    def commit(self) -> None:
+        self.conn.commit()
+
+    def close(self) -> None:
+        self.conn.close()